@@ -0,0 +1,212 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from genetic import (ELITISM, MUTATION_RATE, POP_SIZE, TARGET, TOURNAMENT_K,
+                     Individual, make_initial_population, mutate, single_point_crossover,
+                     tournament_selection)
+
+# Função de fitness plugável: recebe o cromossomo como string e devolve a nota.
+# Para o modo 'process' ela precisa ser definida no topo de um módulo (picklable).
+FitnessFn = Callable[[str], float]
+
+
+# CACHE DE FITNESS
+
+
+class FitnessCache:
+    """
+    Cache LRU limitado, indexado pelos bytes do cromossomo:
+    - elitismo e torneio repetem muitos genomas entre gerações
+    - genomas repetidos não chamam a função de fitness de novo
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._data: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[float]:
+        score = self._data.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key: bytes, score: float) -> None:
+        self._data[key] = score
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # descarta o menos usado recentemente
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@dataclass
+class GenerationReport:
+    generation: int
+    best_fitness: float
+    evaluations: int       # chamadas reais à função de fitness
+    cache_hits: int        # genomas resolvidos pelo cache (ou repetidos na geração)
+    hit_rate: float        # cache_hits / genomas avaliados
+    eval_seconds: float    # tempo de parede gasto avaliando
+    throughput: float      # genomas avaliados por segundo (incluindo acertos do cache)
+
+
+# MOTOR DO AG
+
+
+class GAEngine:
+    """
+    Algoritmo Genético com fitness plugável:
+    - os filhos de cada geração são avaliados em lote, em paralelo
+    - executor 'thread' para fitness que libera o GIL (E/S, numpy, chamadas externas),
+      'process' para fitness em Python puro, None para avaliar em série
+    """
+
+    def __init__(self, fitness_fn: FitnessFn, length: int, pop_size: int = POP_SIZE,
+                 tournament_k: int = TOURNAMENT_K, mutation_rate: float = MUTATION_RATE,
+                 elitism: bool = ELITISM, executor: Optional[str] = "thread",
+                 workers: Optional[int] = None, cache_size: int = 10_000):
+        if executor not in ("thread", "process", None):
+            raise ValueError(f"Executor desconhecido: {executor!r}")
+        self.fitness_fn = fitness_fn
+        self.length = length
+        self.pop_size = pop_size
+        self.tournament_k = tournament_k
+        self.mutation_rate = mutation_rate
+        self.elitism = elitism
+        self.executor = executor
+        self.workers = workers
+        self.cache = FitnessCache(cache_size)
+
+    def _make_executor(self) -> Optional[Executor]:
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers)
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return None
+
+    def evaluate(self, individuals: List[Individual], pool: Optional[Executor]) -> Tuple[int, int, float]:
+        """
+        Avalia uma lista de indivíduos:
+        - consulta o cache e agrupa genomas repetidos dentro da própria geração
+        - só os genomas inéditos vão para o pool, em uma única rodada
+        Retorna (avaliações reais, acertos do cache, segundos gastos).
+        """
+        start = time.perf_counter()
+        pending: Dict[bytes, List[Individual]] = {}
+        hits = 0
+        for ind in individuals:
+            key = ind.as_string().encode()
+            waiting = pending.get(key)
+            if waiting is not None:
+                # Repetido na mesma geração: aproveita a avaliação já agendada
+                waiting.append(ind)
+                hits += 1
+                continue
+            score = self.cache.get(key)
+            if score is not None:
+                ind.fitness = score
+                hits += 1
+            else:
+                pending[key] = [ind]
+
+        keys = list(pending)
+        genomes = [key.decode() for key in keys]
+        if pool is None:
+            scores = map(self.fitness_fn, genomes)
+        else:
+            chunksize = max(1, len(genomes) // (4 * (self.workers or 8)))
+            scores = pool.map(self.fitness_fn, genomes, chunksize=chunksize)
+        for key, score in zip(keys, scores):
+            self.cache.put(key, score)
+            for ind in pending[key]:
+                ind.fitness = score
+        return len(keys), hits, time.perf_counter() - start
+
+    def _breed(self, population: List[Individual], best: Individual) -> List[Individual]:
+        """Seleção, cruzamento e mutação; os filhos saem sem fitness."""
+        new_population = []
+        if self.elitism:
+            new_population.append(Individual(best.genes.copy(), best.fitness))
+        while len(new_population) < self.pop_size:
+            parent1 = tournament_selection(population, self.tournament_k)
+            parent2 = tournament_selection(population, self.tournament_k)
+            child1, child2 = single_point_crossover(parent1, parent2)
+            mutate(child1, self.mutation_rate)
+            mutate(child2, self.mutation_rate)
+            new_population.append(child1)
+            if len(new_population) < self.pop_size:
+                new_population.append(child2)
+        return new_population
+
+    def run(self, max_generations: int, target_fitness: Optional[float] = None,
+            verbose: bool = True) -> Tuple[Individual, List[GenerationReport]]:
+        """Evolui a população e devolve o melhor indivíduo e o relatório de cada geração."""
+        reports = []
+        pool = self._make_executor()
+        try:
+            population = make_initial_population(self.pop_size, self.length)
+            evaluations, hits, seconds = self.evaluate(population, pool)
+            best = max(population, key=lambda i: i.fitness)
+            reports.append(self._report(0, best, evaluations, hits, seconds, verbose))
+
+            generation = 0
+            while generation < max_generations and (target_fitness is None or best.fitness < target_fitness):
+                population = self._breed(population, best)
+                # O elite já carrega seu fitness; só os filhos são avaliados
+                children = population[1:] if self.elitism else population
+                evaluations, hits, seconds = self.evaluate(children, pool)
+                best = max(population, key=lambda i: i.fitness)
+                generation += 1
+                reports.append(self._report(generation, best, evaluations, hits, seconds, verbose))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return best, reports
+
+    def _report(self, generation: int, best: Individual, evaluations: int, hits: int,
+                seconds: float, verbose: bool) -> GenerationReport:
+        total = evaluations + hits
+        report = GenerationReport(
+            generation=generation,
+            best_fitness=best.fitness,
+            evaluations=evaluations,
+            cache_hits=hits,
+            hit_rate=hits / total if total else 0.0,
+            eval_seconds=seconds,
+            throughput=total / seconds if seconds > 0 else float("inf"),
+        )
+        if verbose:
+            print(f"Geração {generation:4d} | Melhor fitness: {report.best_fitness:6.2f} | "
+                  f"avaliações: {evaluations:4d} | cache: {report.hit_rate:6.1%} | "
+                  f"{report.throughput:10.1f} genomas/s | '{best.as_string()}'")
+        return report
+
+
+# EXEMPLO: FITNESS "CARA"
+
+
+def slow_target_fitness(genome: str) -> float:
+    """Mesmo fitness de genetic.py, com atraso simulando uma avaliação custosa (2 ms)."""
+    time.sleep(0.002)
+    return sum(g == t for g, t in zip(genome, TARGET))
+
+
+if __name__ == "__main__":
+    engine = GAEngine(slow_target_fitness, len(TARGET), executor="thread", workers=16)
+    best, reports = engine.run(max_generations=50, target_fitness=len(TARGET))
+    total_evaluations = sum(r.evaluations for r in reports)
+    total_hits = sum(r.cache_hits for r in reports)
+    print("\n=== RESULTADO ===")
+    print(f"Gerações: {reports[-1].generation}")
+    print(f"Melhor indivíduo: '{best.as_string()}' (fitness {best.fitness}/{len(TARGET)})")
+    print(f"Avaliações reais: {total_evaluations} | acertos do cache: {total_hits} "
+          f"({total_hits / (total_evaluations + total_hits):.1%})")
@@ -1,7 +1,11 @@
+import math
 import random
 import string
-from dataclasses import dataclass
-from typing import List, Tuple
+import time
+from dataclasses import dataclass, field
+from itertools import accumulate
+from operator import eq
+from typing import Iterator, List, Optional, Tuple
 
 
 # CONFIGURAÇÕES DO PROBLEMA
@@ -11,6 +15,8 @@ TOURNAMENT_K = 5         # tamanho do torneio na seleção
 MUTATION_RATE = 0.01     # probabilidade de mutação por gene (1%)
 ELITISM = True           # manter o melhor indivíduo da geração
 MAX_GENERATIONS = 14   # limite de gerações para evitar loop infinito
+DELTA_FITNESS = True     # avalia os filhos incrementalmente a partir dos pais
+VERIFY_FITNESS = False   # recalcula o fitness completo e compara (modo de verificação)
 
 # Alfabeto permitido (letras maiúsculas + espaço)
 ALPHABET = string.ascii_uppercase + " "
@@ -21,6 +27,8 @@ ALPHABET = string.ascii_uppercase + " "
 class Individual:
     genes: List[str]
     fitness: int = 0  # número de posições iguais ao TARGET
+    # prefix[i] = acertos em genes[:i]; calculado sob demanda (ver match_prefix)
+    prefix: Optional[List[int]] = field(default=None, repr=False)
 
     def as_string(self) -> str:
         return "".join(self.genes)
@@ -80,40 +88,110 @@ def mutate(ind: Individual, mutation_rate: float) -> None:
             ind.genes[i] = random.choice(ALPHABET)
 
 
-def make_initial_population(size: int, length: int) -> List[Individual]:
-    """Cria a população inicial completamente aleatória."""
-    return [random_individual(length) for _ in range(size)]
+def match_prefix(ind: Individual, target: str) -> List[int]:
+    """
+    Somas de prefixo dos acertos por posição (prefix[i] = acertos em genes[:i]).
+    - calculada uma única vez, e só quando o indivíduo é escolhido como pai
+    - permite obter o fitness de qualquer trecho do cromossomo em O(1)
+    """
+    if ind.prefix is None:
+        ind.prefix = list(accumulate(map(eq, ind.genes, target), initial=0))
+    return ind.prefix
 
 
-# LOOP EVOLUTIVO
+def crossover_with_fitness(parent1: Individual, parent2: Individual, target: str) -> Tuple[Individual, Individual]:
+    """
+    Crossover de ponto único com avaliação incremental:
+    - o fitness de cada filho é o prefixo de um pai somado ao sufixo do outro
+    - nenhum gene do filho é comparado com o alvo
+    """
+    length = len(parent1.genes)
+    if length <= 1:
+        return (Individual(parent1.genes.copy(), parent1.fitness, parent1.prefix),
+                Individual(parent2.genes.copy(), parent2.fitness, parent2.prefix))
 
+    cut = random.randint(1, length - 1)
+    prefix1 = match_prefix(parent1, target)
+    prefix2 = match_prefix(parent2, target)
+    child1 = Individual(parent1.genes[:cut] + parent2.genes[cut:],
+                        prefix1[cut] + prefix2[-1] - prefix2[cut])
+    child2 = Individual(parent2.genes[:cut] + parent1.genes[cut:],
+                        prefix2[cut] + prefix1[-1] - prefix1[cut])
+    return child1, child2
 
-def genetic_algorithm():
-    """Algoritmo Genético simples para evoluir uma string alvo a partir de uma população aleatória.
-    O algoritmo utiliza seleção por torneio, crossover de ponto único e mutação ponto-a-ponto
-    em uma população de indivíduos representados como listas de caracteres."""
-    target_len = len(TARGET)
-    population = make_initial_population(POP_SIZE, target_len)
-    # Avalia população inicial
-    for ind in population:
-        evaluate_fitness(ind, TARGET)
 
-    best = max(population, key=lambda i: i.fitness)
+def mutation_positions(length: int, mutation_rate: float) -> Iterator[int]:
+    """
+    Sorteia as posições que sofrem mutação sem percorrer todos os genes:
+    - o salto até a próxima mutação segue uma distribuição geométrica
+    - mesma distribuição de testar cada gene com probabilidade mutation_rate
+    """
+    if mutation_rate <= 0:
+        return
+    if mutation_rate >= 1:
+        yield from range(length)
+        return
+    log_q = math.log(1.0 - mutation_rate)
+    i = -1
+    while True:
+        i += 1 + int(math.log(1.0 - random.random()) / log_q)
+        if i >= length:
+            return
+        yield i
+
+
+def mutate_incremental(ind: Individual, mutation_rate: float, target: str) -> None:
+    """
+    Mutação ponto-a-ponto com correção do fitness:
+    - só as posições mutadas são comparadas com o alvo, custo O(mutações)
+    """
+    for i in mutation_positions(len(ind.genes), mutation_rate):
+        old = ind.genes[i]
+        new = random.choice(ALPHABET)
+        ind.genes[i] = new
+        ind.fitness += (new == target[i]) - (old == target[i])
 
-    generation = 0
-    while generation < MAX_GENERATIONS and best.fitness < target_len:
-        new_population = []
 
-        # Elitismo: carrega o melhor indivíduo para a próxima geração
-        if ELITISM:
-            new_population.append(Individual(best.genes.copy(), best.fitness))
+def verify_fitness(ind: Individual, target: str) -> None:
+    """Modo de verificação: recalcula o fitness completo e compara com o incremental."""
+    expected = sum(g == t for g, t in zip(ind.genes, target))
+    if ind.fitness != expected:
+        raise RuntimeError(
+            f"Fitness incremental {ind.fitness} difere do recalculado {expected} para '{ind.as_string()}'")
 
-        # Gera novos indivíduos até completar a população
-        while len(new_population) < POP_SIZE:
-            # Seleção: escolhe dois pais via torneio
-            parent1 = tournament_selection(population, TOURNAMENT_K)
-            parent2 = tournament_selection(population, TOURNAMENT_K)
 
+def make_initial_population(size: int, length: int) -> List[Individual]:
+    """Cria a população inicial completamente aleatória."""
+    return [random_individual(length) for _ in range(size)]
+
+
+# LOOP EVOLUTIVO
+
+
+def next_generation(population: List[Individual], best: Individual, target: str,
+                    pop_size: int = POP_SIZE) -> List[Individual]:
+    """Gera e avalia a próxima população (elitismo, torneio, crossover e mutação)."""
+    new_population = []
+
+    # Elitismo: carrega o melhor indivíduo para a próxima geração
+    if ELITISM:
+        new_population.append(Individual(best.genes.copy(), best.fitness, best.prefix))
+
+    # Gera novos indivíduos até completar a população
+    while len(new_population) < pop_size:
+        # Seleção: escolhe dois pais via torneio
+        parent1 = tournament_selection(population, TOURNAMENT_K)
+        parent2 = tournament_selection(population, TOURNAMENT_K)
+
+        if DELTA_FITNESS:
+            # Cruzamento e mutação já corrigem o fitness dos filhos
+            child1, child2 = crossover_with_fitness(parent1, parent2, target)
+            mutate_incremental(child1, MUTATION_RATE, target)
+            mutate_incremental(child2, MUTATION_RATE, target)
+            if VERIFY_FITNESS:
+                verify_fitness(child1, target)
+                verify_fitness(child2, target)
+        else:
             # Cruzamento
             child1, child2 = single_point_crossover(parent1, parent2)
 
@@ -122,19 +200,117 @@ def genetic_algorithm():
             mutate(child2, MUTATION_RATE)
 
             # Avalia os filhos
-            evaluate_fitness(child1, TARGET)
-            evaluate_fitness(child2, TARGET)
+            evaluate_fitness(child1, target)
+            evaluate_fitness(child2, target)
+
+        new_population.append(child1)
+        if len(new_population) < pop_size:
+            new_population.append(child2)
+    return new_population
 
-            new_population.append(child1)
-            if len(new_population) < POP_SIZE:
-                new_population.append(child2)
 
-        population = new_population
+@dataclass
+class GenerationStats:
+    generation: int
+    best: Individual
+    mean_fitness: float
+    diversity: Optional[float]  # fração de cromossomos distintos (None se não medida)
+    evaluations: int            # avaliações de fitness acumuladas
+    elapsed: float              # segundos desde o início da evolução
+    stop_reason: Optional[str] = None  # preenchido só na última geração
+
+    def as_record(self) -> dict:
+        """Versão plana para gravar em CSV/JSON ou enviar a um painel."""
+        return {
+            "generation": self.generation,
+            "best_fitness": self.best.fitness,
+            "best": self.best.as_string(),
+            "mean_fitness": self.mean_fitness,
+            "diversity": self.diversity,
+            "evaluations": self.evaluations,
+            "elapsed": self.elapsed,
+            "stop_reason": self.stop_reason,
+        }
+
+
+def evolve(target: str = TARGET, pop_size: int = POP_SIZE,
+           max_generations: Optional[int] = MAX_GENERATIONS,
+           target_fitness: Optional[int] = None, time_budget: Optional[float] = None,
+           patience: Optional[int] = None, diversity_every: Optional[int] = None
+           ) -> Iterator[GenerationStats]:
+    """
+    Versão em streaming do AG: produz as estatísticas de cada geração (a 0 é a inicial).
+    Critérios de parada (a última estatística traz o motivo em stop_reason):
+    - 'target': melhor fitness atingiu target_fitness (padrão: len(target))
+    - 'plateau': melhor fitness não melhorou por `patience` gerações
+    - 'time': tempo total passou de `time_budget` segundos
+    - 'max_generations': limite de gerações atingido
+    A telemetria reaproveita o que o laço já calcula; só a diversidade percorre os
+    genes: ela monta um conjunto com o cromossomo de cada indivíduo (~6% do tempo da
+    geração se medida em todas). Por isso, por padrão, só é medida na última geração;
+    diversity_every=N mede também a cada N gerações.
+    """
+    if diversity_every is not None and diversity_every < 1:
+        raise ValueError(f"diversity_every deve ser pelo menos 1: {diversity_every!r}")
+    clock = time.perf_counter
+    start = clock()
+    if target_fitness is None:
+        target_fitness = len(target)
+
+    population = make_initial_population(pop_size, len(target))
+    for ind in population:
+        evaluate_fitness(ind, target)
+    evaluations = pop_size
+    children_per_generation = pop_size - 1 if ELITISM else pop_size
+
+    generation = 0
+    best = max(population, key=lambda i: i.fitness)
+    best_so_far, last_improvement = best.fitness, 0
+    while True:
+        if best.fitness > best_so_far:
+            best_so_far, last_improvement = best.fitness, generation
+        elapsed = clock() - start
+
+        stop_reason = None
+        if best.fitness >= target_fitness:
+            stop_reason = "target"
+        elif patience is not None and generation - last_improvement >= patience:
+            stop_reason = "plateau"
+        elif time_budget is not None and elapsed >= time_budget:
+            stop_reason = "time"
+        elif max_generations is not None and generation >= max_generations:
+            stop_reason = "max_generations"
+
+        diversity = None
+        if stop_reason is not None or (diversity_every is not None and generation % diversity_every == 0):
+            diversity = len({"".join(ind.genes) for ind in population}) / len(population)
+        yield GenerationStats(
+            generation=generation,
+            best=best,
+            mean_fitness=sum(ind.fitness for ind in population) / len(population),
+            diversity=diversity,
+            evaluations=evaluations,
+            elapsed=elapsed,
+            stop_reason=stop_reason,
+        )
+        if stop_reason is not None:
+            return
+
+        population = next_generation(population, best, target, pop_size)
+        evaluations += children_per_generation
         best = max(population, key=lambda i: i.fitness)
         generation += 1
 
+
+def genetic_algorithm():
+    """Algoritmo Genético simples para evoluir uma string alvo a partir de uma população aleatória.
+    O algoritmo utiliza seleção por torneio, crossover de ponto único e mutação ponto-a-ponto
+    em uma população de indivíduos representados como listas de caracteres."""
+    target_len = len(TARGET)
+    for stats in evolve(TARGET, POP_SIZE, MAX_GENERATIONS, diversity_every=5):
+        generation, best = stats.generation, stats.best
         # Imprime progresso a cada 5 gerações ou se encontrar a solução
-        if generation % 5 == 0 or best.fitness == target_len:
+        if generation > 0 and (generation % 5 == 0 or best.fitness == target_len):
             print(
                 f"Geração {generation:4d} | Melhor fitness: {best.fitness:2d} | '{best.as_string()}'")
 
@@ -146,4 +322,5 @@ def genetic_algorithm():
     return best, generation
 
 
-genetic_algorithm()
+if __name__ == "__main__":
+    genetic_algorithm()
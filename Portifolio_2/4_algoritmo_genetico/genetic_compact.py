@@ -0,0 +1,187 @@
+import random
+import tracemalloc
+from operator import eq
+from typing import Tuple
+
+from genetic import (ALPHABET, ELITISM, MAX_GENERATIONS, MUTATION_RATE, POP_SIZE, TARGET,
+                     TOURNAMENT_K, make_initial_population, mutation_positions)
+
+# Versão enxuta em memória do AG de genetic.py:
+# - cromossomo em bytearray (1 byte por gene) em vez de lista de strings
+# - indivíduos com __slots__ (sem __dict__)
+# - duas populações pré-alocadas que se alternam a cada geração
+
+ALPHABET_BYTES = ALPHABET.encode("ascii")
+
+
+# ESTRUTURAS BÁSICAS
+class CompactIndividual:
+    __slots__ = ("genes", "fitness")
+
+    def __init__(self, genes: bytearray, fitness: int = 0):
+        self.genes = genes
+        self.fitness = fitness
+
+    def as_string(self) -> str:
+        return self.genes.decode("ascii")
+
+
+def random_compact_individual(length: int) -> CompactIndividual:
+    """Cria um indivíduo aleatório com os genes em um bytearray."""
+    return CompactIndividual(bytearray(random.choice(ALPHABET_BYTES) for _ in range(length)))
+
+
+def evaluate_compact(ind: CompactIndividual, target: bytes) -> int:
+    """Conta os bytes iguais ao alvo (mesmo fitness de genetic.evaluate_fitness)."""
+    ind.fitness = sum(map(eq, ind.genes, target))
+    return ind.fitness
+
+
+class DoubleBufferedPopulation:
+    """
+    Duas populações de mesmo tamanho alocadas uma única vez:
+    - os filhos da próxima geração são escritos por cima dos indivíduos do buffer reserva
+    - ao final da geração os buffers trocam de papel
+    Em regime, o laço evolutivo não aloca nenhum indivíduo nem cromossomo novo.
+    """
+
+    def __init__(self, size: int, target: str):
+        self.target = target.encode("ascii")
+        length = len(self.target)
+        self.current = [random_compact_individual(length) for _ in range(size)]
+        self.spare = [CompactIndividual(bytearray(length)) for _ in range(size)]
+        # Com população ímpar o segundo filho do último par é escrito aqui e descartado
+        self.scratch = CompactIndividual(bytearray(length))
+        for ind in self.current:
+            evaluate_compact(ind, self.target)
+
+    def best(self) -> CompactIndividual:
+        return max(self.current, key=lambda i: i.fitness)
+
+    def _crossover_into(self, parent1: CompactIndividual, parent2: CompactIndividual,
+                        child1: CompactIndividual, child2: CompactIndividual) -> None:
+        """
+        Crossover de ponto único escrito direto nos genes dos filhos:
+        - memoryview fatia os pais sem copiar os genes
+        """
+        length = len(parent1.genes)
+        if length <= 1:
+            child1.genes[:] = parent1.genes
+            child2.genes[:] = parent2.genes
+            return
+        cut = random.randint(1, length - 1)
+        view1, view2 = memoryview(parent1.genes), memoryview(parent2.genes)
+        child1.genes[:cut] = view1[:cut]
+        child1.genes[cut:] = view2[cut:]
+        child2.genes[:cut] = view2[:cut]
+        child2.genes[cut:] = view1[cut:]
+        view1.release()
+        view2.release()
+
+    def _mutate(self, ind: CompactIndividual, mutation_rate: float) -> None:
+        """Mutação ponto-a-ponto in-place, sorteando só as posições mutadas."""
+        for i in mutation_positions(len(ind.genes), mutation_rate):
+            ind.genes[i] = random.choice(ALPHABET_BYTES)
+
+    def step(self, tournament_k: int, mutation_rate: float, elitism: bool) -> CompactIndividual:
+        """Gera a próxima geração no buffer reserva, troca os buffers e devolve o melhor."""
+        population, spare = self.current, self.spare
+        size = len(spare)
+        filled = 0
+        if elitism:
+            best = self.best()
+            spare[0].genes[:] = best.genes
+            spare[0].fitness = best.fitness
+            filled = 1
+
+        while filled < size:
+            parent1 = max(random.sample(population, tournament_k), key=lambda i: i.fitness)
+            parent2 = max(random.sample(population, tournament_k), key=lambda i: i.fitness)
+            child1 = spare[filled]
+            child2 = spare[filled + 1] if filled + 1 < size else self.scratch
+            self._crossover_into(parent1, parent2, child1, child2)
+            self._mutate(child1, mutation_rate)
+            evaluate_compact(child1, self.target)
+            filled += 1
+            if filled < size:
+                self._mutate(child2, mutation_rate)
+                evaluate_compact(child2, self.target)
+                filled += 1
+
+        self.current, self.spare = spare, population
+        return self.best()
+
+
+# LOOP EVOLUTIVO
+
+
+def compact_genetic_algorithm() -> Tuple[CompactIndividual, int]:
+    """Mesmo AG de genetic.genetic_algorithm, usando a representação compacta."""
+    target_len = len(TARGET)
+    population = DoubleBufferedPopulation(POP_SIZE, TARGET)
+    best = population.best()
+
+    generation = 0
+    while generation < MAX_GENERATIONS and best.fitness < target_len:
+        best = population.step(TOURNAMENT_K, MUTATION_RATE, ELITISM)
+        generation += 1
+        if generation % 5 == 0 or best.fitness == target_len:
+            print(
+                f"Geração {generation:4d} | Melhor fitness: {best.fitness:2d} | '{best.as_string()}'")
+
+    print("\n=== RESULTADO ===")
+    print(f"Gerações: {generation}")
+    print(
+        f"Melhor indivíduo: '{best.as_string()}' (fitness {best.fitness}/{target_len})")
+    return best, generation
+
+
+# BENCHMARK DE MEMÓRIA
+
+
+def bytes_per_individual(length: int, size: int = POP_SIZE) -> Tuple[float, float]:
+    """
+    Mede com tracemalloc os bytes alocados por indivíduo:
+    - representação original (dataclass + lista de caracteres)
+    - representação compacta (__slots__ + bytearray)
+    """
+    results = []
+    for build in (lambda: make_initial_population(size, length),
+                  lambda: [random_compact_individual(length) for _ in range(size)]):
+        tracemalloc.start()
+        population = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(current / size)
+        del population
+    return results[0], results[1]
+
+
+def steady_state_growth(length: int, generations: int = 50, size: int = POP_SIZE) -> Tuple[int, int]:
+    """
+    Roda o laço com buffer duplo sob tracemalloc e devolve (bytes retidos, pico):
+    - retidos deve ficar em ~0, pois nada sobrevive de uma geração para a outra
+    - o pico mostra os temporários de uma geração (amostras do torneio, fatias)
+    """
+    target = "".join(random.choice(ALPHABET) for _ in range(length))
+    population = DoubleBufferedPopulation(size, target)
+    population.step(TOURNAMENT_K, MUTATION_RATE, ELITISM)  # aquecimento
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(generations):
+        population.step(TOURNAMENT_K, MUTATION_RATE, ELITISM)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - baseline, peak - baseline
+
+
+if __name__ == "__main__":
+    compact_genetic_algorithm()
+
+    print("\n=== MEMÓRIA POR INDIVÍDUO (tracemalloc) ===")
+    for length in (len(TARGET), 100, 1000, 10000):
+        original, compact = bytes_per_individual(length)
+        print(f"L={length:6d} | original: {original:10.1f} B | compacto: {compact:9.1f} B | "
+              f"redução: {original / compact:5.1f}x")
+    retained, peak = steady_state_growth(1000)
+    print(f"Laço com buffer duplo (L=1000, 50 gerações): retido {retained} B | pico {peak} B")
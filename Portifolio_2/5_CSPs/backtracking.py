@@ -1,7 +1,23 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import argparse
+import heapq
 import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from compiled_graph import CompiledGraph
+
+if TYPE_CHECKING:
+    import networkx as nx
 ####### INSTALE AS DEPENDENCIAS PRESENTES NO ARQUIVO requirements.txt ########
+# O módulo pode ser importado como biblioteca: networkx e matplotlib só são carregados
+# quando o desenho do grafo é pedido (draw_coloring), e nada roda na importação.
+
+# Json com os vizinhos de cada UF, ao lado deste arquivo (independe do diretório atual)
+UF_JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uf_neighbors.json')
 
 # Cores a serem usadas na coloração do grafo
 GROUP_COLORS = {0: 'red',
@@ -9,69 +25,638 @@ GROUP_COLORS = {0: 'red',
                 2: 'blue',
                 3: 'purple'}
 
-# Json com os vizinhos de cada UF
-uf_json_path = '5_CSPs/uf_neighbors.json'
-json_data = None
-with open(uf_json_path, 'r', encoding='utf-8') as f:
-    json_data = json.load(f)
+
+def backtracking_coloring(graph: "nx.Graph", colors: list, backjumping: bool = False) -> bool:
+    """ Realiza a coloração do grafo usando backtracking.
+    A busca roda sobre a forma compilada do grafo (CompiledGraph: vizinhos em CSR e cores
+    em um array de inteiros) e as cores só são escritas no atributo 'group' ao final.
+    Com backjumping, usa a mesma ordem fixa dos nós, mas um nó sem cor válida volta direto
+    ao vizinho responsável mais recente (ver _ColoringSearch) e os conflitos viram nogoods.
+    Retorna True se a coloração for bem-sucedida, False caso contrário."""
+    compiled = CompiledGraph.from_graph(graph)
+    adjacency = compiled.adjacency()
+    if backjumping:
+        result, _ = search_coloring(adjacency, len(colors), mrv=False, lcv=False, propagation=None,
+                                    nogoods=NogoodStore(), backjump=True)
+        if result is None:
+            return False
+        compiled.write_back(graph, result, colors)
+        return True
+    color = compiled.new_color_array()
+    n, n_colors = len(adjacency), len(colors)
+    # Próxima cor (índice em colors) a tentar em cada nó, na ordem de graph.nodes
+    next_color = [0] * n
+    node = 0
+    while 0 <= node < n:
+        color[node] = -1
+        neighbors = adjacency[node]
+        c = next_color[node]
+        # Pula as cores usadas por algum vizinho
+        while c < n_colors and any(color[u] == c for u in neighbors):
+            c += 1
+        if c < n_colors:
+            # Se não houver conflito, atribui a cor e continua para o próximo nó
+            color[node] = c
+            next_color[node] = c + 1
+            node += 1
+        else:
+            # Nenhuma cor válida: volta ao nó anterior (backtrack)
+            next_color[node] = 0
+            node -= 1
+    if node < 0:
+        return False  # Nenhuma cor válida encontrada para o primeiro nó
+    compiled.write_back(graph, color, colors)
+    return True
 
 
-# Constrói o grafo
-G = nx.Graph()
-for uf in json_data:
-    G.add_node(uf, group=None)
-    for neighbor in json_data[uf]:
-        # Adiciona aresta entre UFs vizinhas. Caso o no ainda não exista, ele é criado automaticamente.
-        G.add_edge(uf, neighbor)
+########## BUSCA COM HEURÍSTICAS (MRV, GRAU, LCV) E PROPAGAÇÃO (FC, AC-3/MAC) ##########
+# Os nós são indexados por inteiros e o domínio de cada nó é um bitmask:
+# o bit c ligado significa que a cor colors[c] ainda é permitida para o nó.
 
 
-def backtracking_coloring(graph: nx.Graph, colors: list, node_index=0) -> bool:
-    """ Realiza a coloração do grafo usando backtracking.
-    Retorna True se a coloração for bem-sucedida, False caso contrário."""
-    nodes = list(graph.nodes)
-    # for node in nodes:
-    #     print(f"Tentando colorir UF {node}...")
-    if node_index == len(nodes):
-        return True  # Todas as UFs foram coloridas com sucesso
-
-    node = nodes[node_index]  # Pega o nó atual a ser colorido
-    # Tenta cada cor disponível
-    for color in colors:
-        # Verifica se algum vizinho tem a mesma cor que a cor atual
-        if all(graph.nodes[neighbor]['group'] != color for neighbor in graph.neighbors(node)):
-            # Se não houver conflito, atribui a cor
-            graph.nodes[node]['group'] = color
-            if backtracking_coloring(graph, colors, node_index + 1):
-                return True  # Continua para o próximo nó
-            # Se não funcionar, remove a cor (backtrack)
-            graph.nodes[node]['group'] = None
-    return False  # Nenhuma cor válida encontrada, retorna False
-
-
-# Executa o algoritmo de backtracking para colorir o grafo
-color_list = list(GROUP_COLORS.keys())
-success = backtracking_coloring(G, color_list)
-if not success:
-    print("Não foi possível colorir o grafo com as cores fornecidas.")
-else:
-    # imprime as cores atribuídas a cada nó e seus vizinhos
-    for node in G.nodes:
+@dataclass
+class ColoringStats:
+    nodes_visited: int = 0   # atribuições tentadas
+    backtracks: int = 0      # becos sem saída (nó sem nenhuma cor restante)
+    pruned: int = 0          # valores removidos dos domínios pela propagação
+    learned: int = 0         # nogoods aprendidos
+    skipped: int = 0         # níveis pulados pelo backjumping
+    elapsed: float = 0.0     # segundos
+    aborted: bool = False    # True se a busca parou por node_limit
+
+
+Nogood = FrozenSet[Tuple[int, int]]
+
+
+class NogoodStore:
+    """ Nogoods aprendidos: conjuntos de atribuições (nó, cor) que não podem valer todos
+    juntos em nenhuma solução. Indexados por atribuição, para o teste em assign ser O(nogoods
+    que contêm a atribuição). Capacidade limitada: ao encher, sai o mais antigo.
+    Um nogood aprendido com k cores continua válido com menos cores (as soluções com k-1
+    cores são um subconjunto), então a mesma loja pode ser reaproveitada entre buscas."""
+
+    def __init__(self, capacity: int = 10_000, max_length: int = 16):
+        self.capacity = capacity
+        self.max_length = max_length   # nogoods longos quase nunca disparam: não são guardados
+        self.nogoods: "OrderedDict[Nogood, None]" = OrderedDict()
+        # (nó, cor) -> {nogood: demais pares do nogood}, para o teste não refazer a diferença
+        self.index: Dict[Tuple[int, int], Dict[Nogood, Tuple[Tuple[int, int], ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nogoods)
+
+    def add(self, assignments: Iterable[Tuple[int, int]]) -> bool:
+        """ Guarda o nogood; retorna False se ele for vazio, longo demais ou repetido."""
+        nogood = frozenset(assignments)
+        if not nogood or len(nogood) > self.max_length or nogood in self.nogoods:
+            return False
+        if len(self.nogoods) >= self.capacity:
+            self._discard(next(iter(self.nogoods)))
+        self.nogoods[nogood] = None
+        for pair in nogood:
+            self.index.setdefault(pair, {})[nogood] = tuple(other for other in nogood if other != pair)
+        return True
+
+    def _discard(self, nogood: Nogood) -> None:
+        del self.nogoods[nogood]
+        for pair in nogood:
+            bucket = self.index[pair]
+            del bucket[nogood]
+            if not bucket:
+                del self.index[pair]
+
+    def violated(self, node: int, value: int, color: Sequence[int]) -> Optional[Nogood]:
+        """ Nogood que ficaria completo com node=value (os demais pares já atribuídos), ou None."""
+        bucket = self.index.get((node, value))
+        if bucket:
+            for nogood, rest in bucket.items():
+                for u, c in rest:
+                    if color[u] != c:
+                        break
+                else:
+                    return nogood
+        return None
+
+    def drop_colors(self, n_colors: int) -> None:
+        """ Remove os nogoods que usam cores >= n_colors (inúteis com menos cores)."""
+        for nogood in [ng for ng in self.nogoods if any(c >= n_colors for _, c in ng)]:
+            self._discard(nogood)
+
+
+class _ColoringSearch:
+    """ Estado da busca: domínios em bitmask, cor atribuída, trilha para desfazer
+    podas e heap (tamanho do domínio, -grau dinâmico, nó) para o MRV.
+    propagation: None (só checa conflitos), 'fc' (forward checking) ou
+    'mac' (mantém arco-consistência com AC-3 a cada atribuição). Sem propagação, os
+    domínios ainda perdem as cores dos vizinhos atribuídos quando MRV ou LCV está ligado,
+    para que as duas heurísticas contem só valores legais.
+    Com `nogoods`, atribuições que completam um nogood são rejeitadas e, com propagation
+    None ou 'fc', becos sem saída explicáveis viram nogoods novos (ver solve).
+    Com `backjump` (só None ou 'fc'), um beco sem saída volta direto ao nó mais recente do
+    seu conjunto de conflito (conflict-directed backjumping), em vez do nó anterior.
+    `preferred` é uma cor sugerida por nó (ex.: de uma coloração anterior), tentada primeiro."""
+
+    def __init__(self, adjacency: Sequence[Sequence[int]], n_colors: int, mrv: bool,
+                 lcv: bool, propagation: Optional[str], node_limit: Optional[int],
+                 domains: Optional[List[int]] = None, nogoods: Optional[NogoodStore] = None,
+                 preferred: Optional[Sequence[int]] = None, backjump: bool = False):
+        if propagation not in (None, 'fc', 'mac'):
+            raise ValueError(f"Propagação desconhecida: {propagation!r}")
+        if backjump and propagation == 'mac':
+            raise ValueError("backjump só é suportado com propagation None ou 'fc'")
+        self.adjacency = adjacency
+        self.n_colors = n_colors
+        self.mrv = mrv
+        self.lcv = lcv
+        self.propagation = propagation
+        self.node_limit = node_limit
+        n = len(adjacency)
+        self.domains = list(domains) if domains is not None else [(1 << n_colors) - 1] * n
+        self.initial = list(self.domains)
+        self.nogoods = nogoods
+        self.preferred = preferred
+        self.backjump = backjump
+        # Conjuntos de conflito só são mantidos quando alguém os usa (e sem MAC, cujas podas
+        # encadeadas não têm explicação simples)
+        self.explain = (nogoods is not None or backjump) and propagation != 'mac'
+        # Explicação da última falha de assign: nós atribuídos responsáveis (None = sem explicação)
+        self.failure: Optional[Set[int]] = None
+        self.level = [0] * n   # profundidade na pilha em que cada nó foi atribuído
+        self.color = [-1] * n
+        # Grau dinâmico: número de vizinhos ainda sem cor (desempate do MRV)
+        self.free_degree = [len(neighbors) for neighbors in adjacency]
+        self.trail: List[Tuple[int, int]] = []   # (nó, domínio anterior)
+        self.heap = [(self.domains[i].bit_count(), -self.free_degree[i], i) for i in range(n)]
+        heapq.heapify(self.heap)
+        self.stats = ColoringStats()
+
+    def _push(self, node: int) -> None:
+        heap = self.heap
+        heapq.heappush(heap, (self.domains[node].bit_count(), -self.free_degree[node], node))
+        if len(heap) > 8 * len(self.color) + 64:
+            # Muitas entradas desatualizadas: reconstrói só com o estado atual dos nós sem cor
+            domains, free_degree = self.domains, self.free_degree
+            heap[:] = [(domains[u].bit_count(), -free_degree[u], u)
+                       for u, c in enumerate(self.color) if c < 0]
+            heapq.heapify(heap)
+
+    def _prune(self, node: int, bit: int) -> int:
+        """ Remove a cor `bit` do domínio do nó (registrando na trilha) e devolve o novo domínio."""
+        domain = self.domains[node]
+        self.trail.append((node, domain))
+        domain ^= bit
+        self.domains[node] = domain
+        self.stats.pruned += 1
+        if self.mrv and self.color[node] < 0:
+            self._push(node)
+        return domain
+
+    def propagate(self, queue: List[int]) -> bool:
+        """ AC-3 especializado para restrições de diferença: o arco (y, x) só remove
+        valores de y quando o domínio de x é unitário {c}; nesse caso c sai de y.
+        `queue` começa com os nós cujo domínio acabou de ficar unitário.
+        Retorna False se algum domínio ficar vazio."""
+        domains, adjacency = self.domains, self.adjacency
+        while queue:
+            x = queue.pop()
+            bit = domains[x]
+            for y in adjacency[x]:
+                if domains[y] & bit:
+                    domain = self._prune(y, bit)
+                    if not domain:
+                        return False
+                    if not domain & (domain - 1):
+                        queue.append(y)  # y ficou unitário: propaga também
+        return True
+
+    def ac3(self) -> bool:
+        """ Pré-processamento: propaga a partir de todos os domínios já unitários
+        (nós pré-coloridos ou com uma única cor disponível)."""
+        if any(not d for d in self.domains):
+            return False
+        return self.propagate([i for i, d in enumerate(self.domains) if not d & (d - 1)])
+
+    def select(self, depth: int) -> int:
+        """ Escolhe o próximo nó: MRV com desempate pelo grau, ou a ordem fixa
+        dos nós. Retorna -1 se todos já têm cor."""
+        if not self.mrv:
+            return depth if depth < len(self.color) else -1
+        heap, domains, free_degree, color = self.heap, self.domains, self.free_degree, self.color
+        while heap:
+            size, neg_degree, node = heapq.heappop(heap)
+            # Entradas desatualizadas são descartadas (o estado atual foi empilhado de novo)
+            if color[node] < 0 and size == domains[node].bit_count() and neg_degree == -free_degree[node]:
+                return node
+        return -1
+
+    def order_values(self, node: int) -> List[int]:
+        """ Cores do domínio do nó, na ordem em que serão retiradas com pop().
+        Com LCV, a cor que menos restringe os vizinhos sem cor sai primeiro."""
+        domain = self.domains[node]
+        values = [c for c in range(self.n_colors) if domain >> c & 1]
+        if self.lcv and len(values) > 1:
+            free = [self.domains[u] for u in self.adjacency[node] if self.color[u] < 0]
+            values.sort(key=lambda c: sum(d >> c & 1 for d in free), reverse=True)
+        else:
+            values.reverse()
+        if self.preferred is not None:
+            hint = self.preferred[node]
+            if hint in values and values[-1] != hint:
+                values.remove(hint)
+                values.append(hint)  # cor sugerida sai primeiro
+        return values
+
+    def _witness(self, node: int, removed: int) -> Set[int]:
+        """ Vizinhos atribuídos que explicam as cores `removed` (bitmask) do domínio do nó.
+        Com FC ou sem propagação, toda cor removida tem um vizinho atribuído com ela."""
+        reason = set()
+        for u in self.adjacency[node]:
+            c = self.color[u]
+            if c >= 0 and removed >> c & 1:
+                reason.add(u)
+                removed &= ~(1 << c)
+        return reason
+
+    def assign(self, node: int, value: int) -> bool:
+        """ Atribui a cor e propaga conforme `propagation`.
+        Retorna False se a cor conflita ou se algum domínio fica vazio."""
+        color, domains = self.color, self.domains
+        neighbors = self.adjacency[node]
+        self.failure = None
+        if self.nogoods is not None:
+            nogood = self.nogoods.violated(node, value, color)
+            if nogood is not None:
+                self.failure = {u for u, _ in nogood if u != node}
+                return False
+        if self.propagation is None:
+            for u in neighbors:
+                if color[u] == value:
+                    self.failure = {u}
+                    return False
+        bit = 1 << value
+        color[node] = value
+        self.trail.append((node, domains[node]))
+        domains[node] = bit
+        for u in neighbors:
+            if color[u] < 0:
+                self.free_degree[u] -= 1
+        if self.propagation == 'fc':
+            consistent = True
+            for u in neighbors:
+                if color[u] < 0 and domains[u] & bit and not self._prune(u, bit):
+                    consistent = False  # vizinho ficou com domínio vazio
+                    if self.explain:
+                        # As demais cores de u foram tiradas por outros vizinhos atribuídos
+                        self.failure = self._witness(u, self.initial[u] & ~bit)
+                        self.failure.discard(node)
+                    break
+        elif self.propagation == 'mac':
+            consistent = self.propagate([node])
+        else:
+            consistent = True
+            if self.mrv or self.lcv:
+                # Sem propagação, MRV e LCV ainda precisam contar só as cores legais: tira a cor
+                # dos vizinhos sem cor, mas um domínio vazio só é notado quando o nó é escolhido
+                for u in neighbors:
+                    if color[u] < 0 and domains[u] & bit:
+                        self._prune(u, bit)
+        if self.mrv:
+            for u in neighbors:
+                if color[u] < 0:
+                    self._push(u)
+        return consistent
+
+    def unassign(self, node: int, mark: int) -> None:
+        """ Desfaz a atribuição do nó e todas as podas feitas depois de `mark`."""
+        self.color[node] = -1
+        for u in self.adjacency[node]:
+            if self.color[u] < 0:
+                self.free_degree[u] += 1
+        trail, domains = self.trail, self.domains
+        touched = set()
+        while len(trail) > mark:
+            u, domain = trail.pop()
+            domains[u] = domain
+            touched.add(u)
+        if self.mrv:
+            touched.update(u for u in self.adjacency[node] if self.color[u] < 0)
+            touched.add(node)
+            for u in touched:
+                if self.color[u] < 0:
+                    self._push(u)
+
+    def _frame(self, node: int) -> list:
+        """ Quadro da pilha: [nó, cores restantes, tamanho da trilha, conjunto de conflito].
+        O conjunto de conflito junta os nós atribuídos responsáveis pela falha de cada cor do
+        nó; começa com os vizinhos que já tiraram cores do domínio e vira None se alguma cor
+        falhar sem explicação."""
+        conflict = None
+        if self.explain:
+            conflict = self._witness(node, self.initial[node] & ~self.domains[node])
+        return [node, self.order_values(node), len(self.trail), conflict]
+
+    def _learn(self, conflict: Set[int]) -> None:
+        if self.nogoods is not None and self.nogoods.add((u, self.color[u]) for u in conflict):
+            self.stats.learned += 1
+
+    def solve(self) -> Optional[List[int]]:
+        """ Backtracking iterativo (sem limite de recursão para grafos grandes).
+        Em um beco sem saída com conjunto de conflito C conhecido:
+        - com nogoods, as atribuições de C viram um nogood (não podem valer juntas)
+        - com backjump, a busca desfaz tudo até o nó h mais recente de C e junta C - {h}
+          ao conjunto de conflito de h; os níveis no meio não têm culpa e são pulados
+        Sem backjump, só becos em que todas as cores falharam logo na atribuição têm
+        explicação: uma cor que falhou mais fundo deixa o conjunto do pai como None."""
+        stats = self.stats
+        if self.propagation == 'mac' and not self.ac3():
+            return None  # inconsistente já no pré-processamento
+        node = self.select(0)
+        if node < 0:
+            return self.color
+        stack = [self._frame(node)]
+        while stack:
+            frame = stack[-1]
+            node, values, mark = frame[0], frame[1], frame[2]
+            if self.color[node] >= 0:
+                # A cor anterior deste nó falhou: desfaz antes de tentar a próxima
+                self.unassign(node, mark)
+            if not values:
+                stack.pop()
+                stats.backtracks += 1
+                conflict = frame[3]
+                if conflict is not None:
+                    self._learn(conflict)
+                if self.mrv:
+                    self._push(node)  # volta a concorrer na escolha do MRV
+                if not stack:
+                    continue
+                if not self.backjump or conflict is None:
+                    stack[-1][3] = None  # a cor do pai falhou mais fundo: sem explicação simples
+                    continue
+                if not conflict:
+                    return None  # a falha não depende de nenhuma atribuição: sem solução
+                target = max(conflict, key=self.level.__getitem__)
+                while stack[-1][0] != target:
+                    skipped = stack.pop()
+                    self.unassign(skipped[0], skipped[2])
+                    if self.mrv:
+                        self._push(skipped[0])
+                    stats.skipped += 1
+                conflict.discard(target)
+                if stack[-1][3] is not None:
+                    stack[-1][3] |= conflict
+                continue
+            if self.node_limit is not None and stats.nodes_visited >= self.node_limit:
+                stats.aborted = True
+                return None
+            value = values.pop()
+            stats.nodes_visited += 1
+            self.level[node] = len(stack)
+            if not self.assign(node, value):
+                if frame[3] is not None:
+                    if self.failure is None:
+                        frame[3] = None
+                    else:
+                        frame[3] |= self.failure
+                continue
+            nxt = self.select(len(stack))
+            if nxt < 0:
+                return self.color
+            stack.append(self._frame(nxt))
+        return None
+
+
+def search_coloring(adjacency: Sequence[Sequence[int]], n_colors: int, mrv: bool = True, lcv: bool = True,
+                    propagation: Optional[str] = 'fc', node_limit: Optional[int] = None,
+                    domains: Optional[List[int]] = None, nogoods: Optional[NogoodStore] = None,
+                    preferred: Optional[Sequence[int]] = None, backjump: bool = False
+                    ) -> Tuple[Optional[List[int]], ColoringStats]:
+    """ Mesma busca de heuristic_coloring direto sobre a adjacência indexada por inteiros
+    (ex.: CompiledGraph.adjacency() ou um subgrafo). domains são bitmasks iniciais opcionais;
+    nogoods é uma loja de nogoods usada e alimentada pela busca; preferred, a cor a tentar
+    primeiro em cada nó; backjump liga o conflict-directed backjumping.
+    Retorna (cor de cada nó, como índice em 0..n_colors-1, ou None; estatísticas)."""
+    search = _ColoringSearch(adjacency, n_colors, mrv, lcv, propagation, node_limit, domains,
+                             nogoods, preferred, backjump)
+    start = time.perf_counter()
+    result = search.solve()
+    search.stats.elapsed = time.perf_counter() - start
+    return (list(result) if result is not None else None), search.stats
+
+
+def heuristic_coloring(graph, colors: list, mrv: bool = True, lcv: bool = True,
+                       propagation: Optional[str] = 'fc', node_limit: Optional[int] = None,
+                       precolored: Optional[Dict[Hashable, object]] = None, backjump: bool = False,
+                       learn: bool = False) -> Tuple[Optional[Dict[Hashable, object]], ColoringStats]:
+    """ Coloração por backtracking com MRV (desempate pelo grau), LCV e propagação
+    (None, 'fc' = forward checking, 'mac' = AC-3 no início e a cada atribuição).
+    backjump liga o conflict-directed backjumping e learn guarda nogoods em uma NogoodStore.
+    precolored fixa a cor de alguns nós. Aceita nx.Graph, dict de adjacência ou CompiledGraph.
+    Retorna ({nó: cor} ou None, estatísticas).
+    Com mrv e lcv desligados e propagation=None equivale a backtracking_coloring."""
+    compiled = graph if isinstance(graph, CompiledGraph) else CompiledGraph.from_graph(graph)
+    domains = None
+    if precolored:
+        domains = [(1 << len(colors)) - 1] * len(compiled)
+        for node, color in precolored.items():
+            domains[compiled.index[node]] = 1 << colors.index(color)
+    result, stats = search_coloring(compiled.adjacency(), len(colors), mrv, lcv, propagation,
+                                    node_limit, domains, NogoodStore() if learn else None,
+                                    backjump=backjump)
+    if result is None:
+        return None, stats
+    return {node: colors[c] for node, c in zip(compiled.nodes, result)}, stats
+
+
+def apply_coloring(graph: "nx.Graph", coloring: Dict[Hashable, object]) -> None:
+    """ Escreve a coloração no atributo 'group' dos nós do grafo."""
+    for node, color in coloring.items():
+        graph.nodes[node]['group'] = color
+
+
+########## USO COMO BIBLIOTECA E LINHA DE COMANDO ##########
+
+# Configurações de busca disponíveis em color_graph e na linha de comando
+METHODS = {
+    'backtracking': dict(mrv=False, lcv=False, propagation=None),   # mesmo resultado de backtracking_coloring
+    'cbj': dict(mrv=False, lcv=False, propagation=None, backjump=True, learn=True),
+    'fc': dict(mrv=True, lcv=True, propagation='fc'),
+    'mac': dict(mrv=True, lcv=True, propagation='mac'),
+}
+
+
+def load_adjacency(path: str = UF_JSON_PATH) -> Dict[Hashable, List[Hashable]]:
+    """ Lê o json {nó: [vizinhos]} e devolve a adjacência simétrica, com nós e vizinhos na
+    mesma ordem que o nx.Graph montado a partir do json teria (sem importar o networkx)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+    adjacency: Dict[Hashable, List[Hashable]] = {}
+    for node in json_data:
+        adjacency.setdefault(node, [])
+        for neighbor in json_data[node]:
+            # Mesmo efeito de G.add_edge(node, neighbor): cria o vizinho se preciso, sem repetir
+            if neighbor not in adjacency[node]:
+                adjacency[node].append(neighbor)
+                adjacency.setdefault(neighbor, []).append(node)
+    return adjacency
+
+
+def color_graph(graph, colors: list, method: str = 'backtracking', node_limit: Optional[int] = None
+                ) -> Tuple[Optional[Dict[Hashable, object]], ColoringStats]:
+    """ Colore o grafo (dict de adjacência, nx.Graph ou CompiledGraph) com uma das
+    configurações de METHODS. Retorna ({nó: cor} ou None, estatísticas)."""
+    if method not in METHODS:
+        raise ValueError(f"Método desconhecido: {method!r} (opções: {', '.join(METHODS)})")
+    return heuristic_coloring(graph, colors, node_limit=node_limit, **METHODS[method])
+
+
+def print_coloring(adjacency: Dict[Hashable, Sequence[Hashable]], coloring: Dict[Hashable, object],
+                   names: Optional[Dict[object, str]] = None) -> None:
+    """ Imprime a cor de cada nó e de seus vizinhos (names traduz o índice da cor em um nome)."""
+    names = names if names is not None else GROUP_COLORS
+    for node in adjacency:
         print(
-            f"UF: {node}, Cor: {GROUP_COLORS[G.nodes[node]['group']]}, Vizinhos e as cores deles: " +
-            ", ".join(
-                [f"{neighbor}({GROUP_COLORS[G.nodes[neighbor]['group']]})" for neighbor in G.neighbors(node)])
+            f"UF: {node}, Cor: {names[coloring[node]]}, Vizinhos e as cores deles: " +
+            ", ".join([f"{neighbor}({names[coloring[neighbor]]})" for neighbor in adjacency[node]])
         )
 
-# Gera lista de cores para visualização do grafo
-node_colors = [GROUP_COLORS[G.nodes[node]['group']] if G.nodes[node]
-               ['group'] is not None else 'gray' for node in G.nodes]
-
-# Desenha o grafo
-pos = nx.spring_layout(G, k=5, method='energy')
-nx.draw(G, pos, with_labels=True, node_color=node_colors,
-        font_weight='bold', font_color='white', font_size=10)
-plt.show()
-# PROFESSOR: Caso não seja possível visualizar o grafo na tela, comente a linha plt.show() acima
-# e descomente as linhas abaixo para salvar a imagem em um arquivo png
-# plt.savefig("5_CSPs/grafo_coloring.png", dpi=200)
-# print("Imagem do grafo salva em grafo_coloring.png")
+
+def _spectral_positions(graph) -> Dict[Hashable, Tuple[float, float]]:
+    """ Layout espectral para grafos grandes: posições dadas pelo 2º e 3º autovetores da
+    adjacência normalizada D^-1/2 A D^-1/2 (os de menor autovalor do laplaciano normalizado),
+    calculados com eigsh esparso. Em 20 mil nós leva ~0.1 s, contra dezenas de segundos do
+    spring_layout ou do nx.spectral_layout. Sem scipy, cai no layout aleatório."""
+    import networkx as nx
+    try:
+        import numpy as np
+        import scipy.sparse as sparse
+        from scipy.sparse.linalg import eigsh
+    except ImportError:
+        return nx.random_layout(graph, seed=0)
+    if len(graph) < 4:
+        return nx.random_layout(graph, seed=0)
+    nodes = list(graph)
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, format='csr', dtype=float)
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    scale = sparse.diags(1.0 / np.sqrt(np.maximum(degree, 1.0)))
+    _, vectors = eigsh(scale @ adjacency @ scale, k=3, which='LA', tol=1e-4)
+    coords = scale @ vectors[:, :2]   # as colunas vêm em ordem crescente: a última é a trivial
+    return {node: (x, y) for node, (x, y) in zip(nodes, coords)}
+
+
+def draw_coloring(adjacency: Dict[Hashable, Sequence[Hashable]], coloring: Optional[Dict[Hashable, object]],
+                  output: Optional[str] = None, layout: str = 'auto', names: Optional[Dict[object, str]] = None,
+                  seed: int = 0) -> Dict[str, float]:
+    """ Desenha o grafo colorido. Com output, renderiza direto no arquivo (backend Agg, sem
+    janela); senão abre a janela do matplotlib.
+    layout: 'spring' (o original, bom para o mapa das UFs), 'spectral' (_spectral_positions,
+    para grafos grandes em que o spring_layout domina o tempo), 'random' ou 'auto' (spring até
+    500 nós, spectral acima). Em grafos grandes os rótulos são omitidos
+    e as arestas vão em uma única LineCollection em vez de nx.draw.
+    Retorna o tempo (s) de importação, layout e desenho."""
+    timings = {}
+    start = time.perf_counter()
+    import matplotlib
+    if output is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    from matplotlib.collections import LineCollection
+    timings["import"] = time.perf_counter() - start
+
+    names = names if names is not None else GROUP_COLORS
+    graph = nx.Graph()
+    graph.add_nodes_from(adjacency)
+    graph.add_edges_from((node, neighbor) for node in adjacency for neighbor in adjacency[node])
+    node_colors = [names.get(coloring[node], 'gray') if coloring and coloring.get(node) is not None
+                   else 'gray' for node in graph.nodes]
+    large = len(graph) > 500
+    if layout == 'auto':
+        layout = 'spectral' if large else 'spring'
+
+    start = time.perf_counter()
+    if layout == 'spring':
+        pos = nx.spring_layout(graph, k=5, method='energy', seed=seed)
+    elif layout == 'spectral':
+        pos = _spectral_positions(graph)
+    elif layout == 'random':
+        pos = nx.random_layout(graph, seed=seed)
+    else:
+        raise ValueError(f"Layout desconhecido: {layout!r}")
+    timings["layout"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if large:
+        fig, ax = plt.subplots(figsize=(12, 12))
+        ax.add_collection(LineCollection([(pos[u], pos[v]) for u, v in graph.edges],
+                                         colors='lightgray', linewidths=0.3))
+        xs, ys = zip(*(pos[node] for node in graph.nodes))
+        ax.scatter(xs, ys, c=node_colors, s=4, linewidths=0)
+        ax.set_axis_off()
+    else:
+        nx.draw(graph, pos, with_labels=True, node_color=node_colors,
+                font_weight='bold', font_color='white', font_size=10)
+    if output is not None:
+        plt.savefig(output, dpi=200)
+        plt.close('all')
+    timings["draw"] = time.perf_counter() - start
+    if output is None:
+        plt.show()
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Coloração de grafos por backtracking (padrão: mapa das UFs)")
+    parser.add_argument('graph', nargs='?', default=UF_JSON_PATH,
+                        help="grafo em json {nó: [vizinhos]}, .col (DIMACS) ou lista de arestas")
+    parser.add_argument('--colors', type=int, default=len(GROUP_COLORS), help="número de cores")
+    parser.add_argument('--method', choices=list(METHODS), default='backtracking')
+    parser.add_argument('--node-limit', type=int, help="limite de atribuições da busca")
+    parser.add_argument('--chromatic', action='store_true', help="calcula o número cromático")
+    parser.add_argument('--output', help="salva o desenho neste arquivo (sem abrir janela)")
+    parser.add_argument('--layout', choices=['auto', 'spring', 'spectral', 'random'], default='auto')
+    parser.add_argument('--no-draw', action='store_true', help="não desenha o grafo")
+    parser.add_argument('--quiet', action='store_true', help="não imprime a cor de cada nó")
+    args = parser.parse_args(argv)
+
+    if args.graph.endswith('.json'):
+        adjacency = load_adjacency(args.graph)
+    else:
+        from graph_io import load_graph
+        adjacency = {node: sorted(neighbors, key=str) for node, neighbors in load_graph(args.graph).items()}
+    color_list = list(range(args.colors))
+    names = GROUP_COLORS if args.colors <= len(GROUP_COLORS) else {c: f"C{c}" for c in color_list}
+
+    start = time.perf_counter()
+    if args.chromatic:
+        from chromatic import chromatic_number
+        coloring, info = chromatic_number(adjacency, node_limit=args.node_limit)
+        bound = "" if info.exact else f" (limite inferior {info.lower_bound}, busca interrompida)"
+        print(f"Número cromático: {info.upper_bound}{bound}")
+        if info.upper_bound > len(names):
+            names = {c: f"C{c}" for c in range(info.upper_bound)}
+    else:
+        coloring, stats = color_graph(adjacency, color_list, args.method, args.node_limit)
+    elapsed = time.perf_counter() - start
+
+    if coloring is None:
+        print("Não foi possível colorir o grafo com as cores fornecidas.")
+    elif not args.quiet:
+        # imprime as cores atribuídas a cada nó e seus vizinhos
+        print_coloring(adjacency, coloring, names)
+    if args.quiet:
+        print(f"{len(adjacency)} nós resolvidos em {elapsed:.3f}s")
+
+    if not args.no_draw:
+        timings = draw_coloring(adjacency, coloring, args.output, args.layout, names)
+        if args.output:
+            print(f"Imagem do grafo salva em {args.output} (importação {timings['import']:.2f}s, "
+                  f"layout {timings['layout']:.2f}s, desenho {timings['draw']:.2f}s)")
+    return 0 if coloring is not None else 1
+
+
+if __name__ == "__main__":
+    # Ex.: python 5_CSPs/backtracking.py                              (mapa das UFs, abre a janela)
+    #      python 5_CSPs/backtracking.py --output grafo_coloring.png   (sem janela)
+    #      python 5_CSPs/backtracking.py grafo.col --colors 5 --method mac --no-draw --quiet
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backtracking import UF_JSON_PATH, NogoodStore, search_coloring
+from compiled_graph import CompiledGraph
+
+####### Número cromático: menor número de cores que colore o grafo ########
+# 1. limite superior: coloração gulosa DSATUR (sempre válida)
+# 2. limite inferior: uma clique encontrada gulosamente (cada nó dela precisa de uma cor)
+# 3. busca descendente: com a melhor coloração de k cores em mãos, tenta k-1 até falhar
+#    ou chegar ao limite inferior. Cada busca reaproveita a anterior:
+#    - a coloração de k cores é a cor sugerida de cada nó na busca com k-1
+#    - os nogoods aprendidos continuam válidos com menos cores (mesma NogoodStore)
+#    - a clique tem as cores fixadas em 0..q-1 em todas as buscas (quebra de simetria)
+
+
+@dataclass
+class ChromaticStats:
+    lower_bound: int = 0          # tamanho da clique (ou k+1 se a busca com k cores falhou)
+    upper_bound: int = 0          # cores da melhor coloração encontrada
+    dsatur_colors: int = 0        # cores usadas pelo DSATUR
+    exact: bool = False           # True se lower_bound == upper_bound (número cromático provado)
+    nodes_visited: int = 0
+    backtracks: int = 0
+    learned: int = 0              # nogoods aprendidos somando todas as buscas
+    elapsed: float = 0.0
+    searches: List[dict] = field(default_factory=list)   # uma entrada por valor de k testado
+
+
+def dsatur_coloring(adjacency: Sequence[Sequence[int]]) -> List[int]:
+    """ DSATUR: colore primeiro o nó com mais cores distintas entre os vizinhos (saturação),
+    desempate pelo grau, sempre com a menor cor livre. Retorna a cor de cada nó."""
+    n = len(adjacency)
+    color = [-1] * n
+    neighbor_colors = [0] * n   # bitmask das cores vistas nos vizinhos
+    saturation = [0] * n
+    heap = [(0, -len(adjacency[v]), v) for v in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        neg_saturation, _, v = heapq.heappop(heap)
+        if color[v] >= 0 or -neg_saturation != saturation[v]:
+            continue  # entrada desatualizada
+        free = ~neighbor_colors[v]
+        c = (free & -free).bit_length() - 1
+        color[v] = c
+        bit = 1 << c
+        for u in adjacency[v]:
+            if color[u] < 0 and not neighbor_colors[u] & bit:
+                neighbor_colors[u] |= bit
+                saturation[u] += 1
+                heapq.heappush(heap, (-saturation[u], -len(adjacency[u]), u))
+    return color
+
+
+def greedy_clique(adjacency: Sequence[Sequence[int]], tries: int = 20) -> List[int]:
+    """ Clique gulosa: a partir de cada um dos `tries` nós de maior grau, adiciona o candidato
+    de maior grau adjacente a todos os já escolhidos. Retorna a maior clique encontrada."""
+    best: List[int] = []
+    starts = sorted(range(len(adjacency)), key=lambda v: len(adjacency[v]), reverse=True)[:tries]
+    for start in starts:
+        clique = [start]
+        candidates = set(adjacency[start])
+        while candidates:
+            v = max(candidates, key=lambda u: len(adjacency[u]))
+            clique.append(v)
+            candidates.intersection_update(adjacency[v])
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def _align_to_clique(color: List[int], clique: List[int]) -> List[int]:
+    """ Renomeia as cores para que clique[i] tenha a cor i (a clique tem cores distintas
+    em qualquer coloração válida, então é só uma permutação)."""
+    n_colors = max(color) + 1
+    mapping = {color[v]: i for i, v in enumerate(clique)}
+    rest = iter(i for i in range(n_colors) if i not in mapping.values())
+    for c in range(n_colors):
+        if c not in mapping:
+            mapping[c] = next(rest)
+    return [mapping[c] for c in color]
+
+
+def chromatic_number(graph, propagation: Optional[str] = 'fc', node_limit: Optional[int] = None,
+                     learn: bool = True, nogood_capacity: int = 10_000
+                     ) -> Tuple[Dict[Hashable, int], ChromaticStats]:
+    """ Busca o número cromático (ver o topo do módulo). node_limit vale para cada busca;
+    se uma busca parar por ele, o resultado fica entre lower_bound e upper_bound (exact=False).
+    Aceita nx.Graph, dict de adjacência ou CompiledGraph.
+    Retorna ({nó: índice da cor} da melhor coloração, estatísticas)."""
+    start = time.perf_counter()
+    compiled = graph if isinstance(graph, CompiledGraph) else CompiledGraph.from_graph(graph)
+    adjacency = compiled.adjacency()
+    stats = ChromaticStats()
+    if not adjacency:
+        stats.exact = True
+        return {}, stats
+
+    clique = greedy_clique(adjacency)
+    best = _align_to_clique(dsatur_coloring(adjacency), clique)
+    stats.lower_bound = len(clique)
+    stats.upper_bound = stats.dsatur_colors = max(best) + 1
+    nogoods = NogoodStore(nogood_capacity) if learn and propagation != 'mac' else None
+
+    k = stats.upper_bound - 1
+    while k >= stats.lower_bound:
+        domains = [(1 << k) - 1] * len(adjacency)
+        for i, v in enumerate(clique):
+            domains[v] = 1 << i
+        if nogoods is not None:
+            nogoods.drop_colors(k)
+        result, search = search_coloring(adjacency, k, propagation=propagation, node_limit=node_limit,
+                                         domains=domains, nogoods=nogoods, preferred=best)
+        stats.nodes_visited += search.nodes_visited
+        stats.backtracks += search.backtracks
+        stats.learned += search.learned
+        status = "ok" if result is not None else ("limite" if search.aborted else "sem solução")
+        stats.searches.append({"k": k, "status": status, "nodes_visited": search.nodes_visited,
+                               "backtracks": search.backtracks, "learned": search.learned,
+                               "nogoods": len(nogoods) if nogoods is not None else 0,
+                               "elapsed": search.elapsed})
+        if result is None:
+            if not search.aborted:
+                stats.lower_bound = k + 1  # provado: k cores não bastam
+            break
+        best = result
+        stats.upper_bound = k
+        k -= 1
+
+    stats.exact = stats.lower_bound == stats.upper_bound
+    stats.elapsed = time.perf_counter() - start
+    return dict(zip(compiled.nodes, best)), stats
+
+
+if __name__ == "__main__":
+    # Uso: python chromatic.py [grafo.json|grafo.col|arestas.txt]  (padrão: mapa das UFs)
+    from graph_io import load_graph
+    if len(sys.argv) > 1:
+        adjacency_data = load_graph(sys.argv[1])
+    else:
+        with open(UF_JSON_PATH, 'r', encoding='utf-8') as f:
+            adjacency_data = json.load(f)
+    coloring, info = chromatic_number(adjacency_data, node_limit=1_000_000)
+    for entry in info.searches:
+        print(f"k={entry['k']:3d}: {entry['status']:12s} visitados={entry['nodes_visited']:8d} "
+              f"backtracks={entry['backtracks']:8d} nogoods={entry['nogoods']:6d} "
+              f"tempo={entry['elapsed']:.3f}s")
+    if info.exact:
+        print(f"Número cromático: {info.upper_bound} (DSATUR usou {info.dsatur_colors})")
+    else:
+        print(f"Número cromático entre {info.lower_bound} e {info.upper_bound} (busca interrompida)")
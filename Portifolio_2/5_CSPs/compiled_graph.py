@@ -0,0 +1,83 @@
+import json
+from array import array
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+####### Forma compilada do grafo usada pelas buscas de coloração ########
+# Em vez de consultar graph.nodes[vizinho]['group'] (dicts aninhados do networkx) a cada
+# teste, a busca trabalha com inteiros:
+#   - nós numerados de 0 a n-1 (nodes[i] guarda o nó original)
+#   - adjacência em CSR: os vizinhos do nó i são targets[offsets[i]:offsets[i + 1]]
+#   - cor de cada nó em um array de inteiros (-1 = sem cor)
+
+
+class CompiledGraph:
+    def __init__(self, nodes: List[Hashable], offsets: array, targets: array):
+        self.nodes = nodes
+        self.offsets = offsets   # array('q') com n + 1 posições
+        self.targets = targets   # array('i') com 2 * (número de arestas) posições
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self._adjacency: Optional[List[Tuple[int, ...]]] = None
+
+    @classmethod
+    def from_graph(cls, graph) -> "CompiledGraph":
+        """ Compila um nx.Graph ou um dict {nó: [vizinhos]} (como o json das UFs).
+        Arestas repetidas, laços e listas de vizinhos assimétricas são normalizados."""
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        neighbor_sets: List[set] = [set() for _ in nodes]
+        for node in list(nodes):
+            i = index[node]
+            for neighbor in graph[node]:
+                j = index.get(neighbor)
+                if j is None:
+                    # Vizinho que não aparece como chave (json incompleto)
+                    j = index[neighbor] = len(nodes)
+                    nodes.append(neighbor)
+                    neighbor_sets.append(set())
+                if i != j:
+                    neighbor_sets[i].add(j)
+                    neighbor_sets[j].add(i)
+        offsets = array('q', [0])
+        targets = array('i')
+        for neighbors in neighbor_sets:
+            targets.extend(sorted(neighbors))
+            offsets.append(len(targets))
+        return cls(nodes, offsets, targets)
+
+    @classmethod
+    def from_json(cls, path: str) -> "CompiledGraph":
+        """ Compila direto do json de adjacência, sem construir um nx.Graph."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_graph(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets) // 2
+
+    def degree(self, i: int) -> int:
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def neighbors(self, i: int) -> array:
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def adjacency(self) -> List[Tuple[int, ...]]:
+        """ Vizinhos de cada nó como tuplas, montadas uma única vez a partir do CSR.
+        É a forma mais rápida de percorrer vizinhos em laços Python."""
+        if self._adjacency is None:
+            offsets, targets = self.offsets, self.targets
+            self._adjacency = [tuple(targets[offsets[i]:offsets[i + 1]]) for i in range(len(self.nodes))]
+        return self._adjacency
+
+    def new_color_array(self) -> array:
+        """ Array de cores inteiras, todas -1 (sem cor)."""
+        return array('i', [-1]) * len(self.nodes)
+
+    def write_back(self, graph, color: Sequence[int], colors: list, attribute: str = 'group') -> None:
+        """ Escreve a coloração (índices em `colors`) nos atributos dos nós do nx.Graph.
+        Chamado só ao final da busca."""
+        node_attributes = graph.nodes
+        for node, c in zip(self.nodes, color):
+            node_attributes[node][attribute] = colors[c] if c >= 0 else None
@@ -0,0 +1,369 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from backtracking import NogoodStore, heuristic_coloring, search_coloring
+from compiled_graph import CompiledGraph
+from decomposition import decomposed_coloring
+from graph_io import Adjacency, load_graph, planar_graph, planar_grid_graph, random_graph
+from min_conflicts import min_conflicts_coloring
+
+####### Suíte de benchmark dos resolvedores de coloração ########
+# Roda cada configuração de resolvedor em cada instância e grava os resultados (json ou
+# csv) com tempo, backtracks, podas e pico de memória, para comparar versões do código:
+#   python csp_benchmark.py --out resultados.json
+#   python csp_benchmark.py --instance dimacs/le450_15c.col:15 --out le450.csv
+#   python csp_benchmark.py --compare antes.json depois.json
+
+
+@dataclass
+class Instance:
+    name: str
+    build: Callable[[], Adjacency]   # gera ou lê o grafo
+    n_colors: int
+
+
+@dataclass
+class SolverResult:
+    coloring: Optional[dict]
+    aborted: bool = False
+    nodes_visited: int = 0
+    backtracks: int = 0
+    pruned: int = 0
+    steps: int = 0
+
+
+# Resolvedor: (grafo compilado, cores, limite de nós, limite de tempo) -> SolverResult
+Solver = Callable[[CompiledGraph, list, int, float], SolverResult]
+
+
+def _heuristic(mrv: bool, lcv: bool, propagation: Optional[str], backjump: bool = False,
+               learn: bool = False) -> Solver:
+    def solve(graph: CompiledGraph, colors: list, node_limit: int, time_limit: float) -> SolverResult:
+        coloring, stats = heuristic_coloring(graph, colors, mrv=mrv, lcv=lcv, propagation=propagation,
+                                             node_limit=node_limit, backjump=backjump, learn=learn)
+        return SolverResult(coloring, stats.aborted, stats.nodes_visited, stats.backtracks, stats.pruned)
+    return solve
+
+
+def _decomposed(graph: CompiledGraph, colors: list, node_limit: int, time_limit: float) -> SolverResult:
+    # workers=1: tudo no próprio processo, para o tracemalloc enxergar a memória
+    coloring, stats = decomposed_coloring(graph, colors, workers=1, node_limit=node_limit)
+    return SolverResult(coloring, stats.aborted, stats.nodes_visited, stats.backtracks)
+
+
+def _min_conflicts(graph: CompiledGraph, colors: list, node_limit: int, time_limit: float) -> SolverResult:
+    # Um único reinício no próprio processo, para o tracemalloc enxergar a memória
+    coloring, stats = min_conflicts_coloring(graph, colors, time_limit=time_limit, restarts=1)
+    return SolverResult(coloring, coloring is None, steps=stats.steps)
+
+
+# Configurações comparadas
+SOLVERS: Dict[str, Solver] = {
+    "ordem fixa (original)": _heuristic(False, False, None),
+    "MRV + grau": _heuristic(True, False, None),
+    "MRV + grau + FC": _heuristic(True, False, 'fc'),
+    "MRV + grau + LCV + FC": _heuristic(True, True, 'fc'),
+    "MRV + grau + LCV + MAC": _heuristic(True, True, 'mac'),
+    "MRV + grau + LCV + FC + CBJ": _heuristic(True, True, 'fc', backjump=True, learn=True),
+    "decomposição + MAC": _decomposed,
+    "min-conflicts": _min_conflicts,
+}
+
+
+def default_suite(quick: bool = False) -> List[Instance]:
+    """ Instâncias geradas com semente fixa (as mesmas em toda execução)."""
+    if quick:
+        sizes = {"random": 3_000, "planar_small": 500, "planar_large": 5_000, "grid": 50}
+    else:
+        sizes = {"random": 10_000, "planar_small": 2_000, "planar_large": 20_000, "grid": 100}
+    return [
+        Instance("aleatório n=1000 grau=4", lambda: random_graph(1_000, 4.0, seed=1), 4),
+        Instance(f"aleatório n={sizes['random']} grau=4", lambda: random_graph(sizes['random'], 4.0, seed=2), 4),
+        Instance("aleatório n=200 grau=8", lambda: random_graph(200, 8.0, seed=3), 4),
+        Instance("aleatório n=3000 grau=7", lambda: random_graph(3_000, 7.0, seed=7), 4),
+        Instance("aleatório n=2000 grau=4.2", lambda: random_graph(2_000, 4.2, seed=7), 3),
+        Instance(f"planar n={sizes['planar_small']}", lambda: planar_graph(sizes['planar_small'], seed=4), 4),
+        Instance(f"planar n={sizes['planar_large']}", lambda: planar_graph(sizes['planar_large'], seed=5), 4),
+        Instance(f"grade planar {sizes['grid']}x{sizes['grid']}",
+                 lambda: planar_grid_graph(sizes['grid'], sizes['grid'], seed=6), 4),
+    ]
+
+
+def file_instance(spec: str) -> Instance:
+    """ Instância lida de arquivo, no formato "caminho:cores" (.col, .json ou lista de arestas)."""
+    path, k = spec.rsplit(':', 1)
+    return Instance(os.path.basename(path), lambda: load_graph(path), int(k))
+
+
+def _valid(compiled: CompiledGraph, coloring: dict) -> bool:
+    color = [coloring[node] for node in compiled.nodes]
+    return all(color[u] != color[v] for v, neighbors in enumerate(compiled.adjacency()) for u in neighbors)
+
+
+def run_suite(instances: List[Instance], solvers: Dict[str, Solver] = SOLVERS, node_limit: int = 200_000,
+              time_limit: float = 10.0, measure_memory: bool = True) -> List[dict]:
+    """ Roda todos os resolvedores em todas as instâncias e imprime uma tabela.
+    O tempo vem de uma execução sem rastreamento; com measure_memory, uma segunda execução
+    sob tracemalloc mede o pico de memória (o tracemalloc deixa o Python mais lento)."""
+    rows = []
+    print(f"{'instância':28s} {'resolvedor':24s} {'tempo (s)':>10s} {'visitados':>10s} "
+          f"{'backtracks':>10s} {'podas':>10s} {'pico (KiB)':>10s}  status")
+    for instance in instances:
+        start = time.perf_counter()
+        compiled = CompiledGraph.from_graph(instance.build())
+        compiled.adjacency()
+        compile_seconds = time.perf_counter() - start
+        colors = list(range(instance.n_colors))
+        for solver_name, solver in solvers.items():
+            start = time.perf_counter()
+            result = solver(compiled, colors, node_limit, time_limit)
+            elapsed = time.perf_counter() - start
+
+            peak = None
+            if measure_memory:
+                tracemalloc.start()
+                solver(compiled, colors, node_limit, time_limit)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            if result.aborted:
+                status = "limite"
+            elif result.coloring is None:
+                status = "sem solução"
+            elif not _valid(compiled, result.coloring):
+                status = "inválida"
+            else:
+                status = "ok"
+            row = {
+                "instance": instance.name, "n": len(compiled), "edges": compiled.n_edges,
+                "n_colors": instance.n_colors, "solver": solver_name, "status": status,
+                "elapsed": elapsed, "compile_seconds": compile_seconds,
+                "nodes_visited": result.nodes_visited, "backtracks": result.backtracks,
+                "pruned": result.pruned, "steps": result.steps, "peak_bytes": peak,
+            }
+            rows.append(row)
+            peak_text = f"{peak / 1024:10.0f}" if peak is not None else f"{'-':>10s}"
+            print(f"{instance.name:28s} {solver_name:24s} {elapsed:10.3f} {result.nodes_visited:10d} "
+                  f"{result.backtracks:10d} {result.pruned:10d} {peak_text}  {status}")
+    return rows
+
+
+def _metadata() -> dict:
+    """ Identifica a execução: versão do Python, máquina e commit do git (se houver)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "commit": commit}
+
+
+def write_results(rows: List[dict], path: str) -> None:
+    """ Grava os resultados em .csv (uma linha por execução) ou .json (com metadados)."""
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"metadata": _metadata(), "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+def _read_results(path: str) -> List[dict]:
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)["results"]
+
+
+def compare_results(before_path: str, after_path: str) -> List[dict]:
+    """ Compara duas execuções da suíte (ex.: duas versões): razão de tempo e backtracks
+    para cada par (instância, resolvedor) presente nas duas."""
+    before = {(r["instance"], r["solver"]): r for r in _read_results(before_path)}
+    comparison = []
+    print(f"{'instância':28s} {'resolvedor':24s} {'tempo antes':>11s} {'depois':>9s} {'razão':>7s} "
+          f"{'backtracks antes':>16s} {'depois':>9s}  status")
+    for row in _read_results(after_path):
+        old = before.get((row["instance"], row["solver"]))
+        if old is None:
+            continue
+        t0, t1 = float(old["elapsed"]), float(row["elapsed"])
+        b0, b1 = int(old["backtracks"]), int(row["backtracks"])
+        ratio = t1 / t0 if t0 > 0 else float('inf')
+        status = row["status"] if row["status"] == old["status"] else f"{old['status']} -> {row['status']}"
+        print(f"{row['instance']:28s} {row['solver']:24s} {t0:11.3f} {t1:9.3f} {ratio:7.2f} "
+              f"{b0:16d} {b1:9d}  {status}")
+        comparison.append({"instance": row["instance"], "solver": row["solver"], "time_ratio": ratio,
+                           "backtracks_before": b0, "backtracks_after": b1, "status": status})
+    return comparison
+
+
+def benchmark_graph_access(n: int = 100_000, avg_degree: float = 4.0, n_colors: int = 4, seed: int = 0) -> dict:
+    """ Mede o custo por nó do teste de conflito do laço interno de backtracking_coloring:
+    - networkx: graph.nodes[vizinho]['group'] para cada vizinho e cada cor,
+      mais o list(graph.nodes) que a versão recursiva refazia a cada chamada
+    - compilado: array de cores inteiras indexado pelos vizinhos do CSR"""
+    import networkx as nx
+    rng = random.Random(seed)
+    graph = nx.Graph(random_graph(n, avg_degree, seed))
+    for node in graph.nodes:
+        graph.nodes[node]['group'] = rng.randrange(n_colors)
+    colors = list(range(n_colors))
+
+    start = time.perf_counter()
+    for node in graph.nodes:
+        for color in colors:
+            all(graph.nodes[neighbor]['group'] != color for neighbor in graph.neighbors(node))
+    nx_scan = time.perf_counter() - start
+
+    repeats = 100
+    start = time.perf_counter()
+    for _ in range(repeats):
+        list(graph.nodes)
+    nodes_list = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    compiled = CompiledGraph.from_graph(graph)
+    adjacency = compiled.adjacency()
+    color = compiled.new_color_array()
+    for i, node in enumerate(compiled.nodes):
+        color[i] = graph.nodes[node]['group']
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(len(adjacency)):
+        neighbors = adjacency[i]
+        for c in colors:
+            all(color[u] != c for u in neighbors)
+    compiled_scan = time.perf_counter() - start
+
+    result = {
+        "n": n,
+        "networkx_us_per_node": 1e6 * nx_scan / n,
+        "list_nodes_us_per_call": 1e6 * nodes_list,
+        "compiled_us_per_node": 1e6 * compiled_scan / n,
+        "compile_seconds": compile_time,
+    }
+    print(f"n={n}: networkx {result['networkx_us_per_node']:.2f} us/nó "
+          f"(+ {result['list_nodes_us_per_call']:.0f} us por list(graph.nodes)) | "
+          f"compilado {result['compiled_us_per_node']:.2f} us/nó | "
+          f"compilação única {compile_time:.2f} s")
+    return result
+
+
+def compare_backjumping(n: int = 60, avg_degree: float = 4.6, n_colors: int = 3, seeds: int = 20,
+                        mrv: bool = False, node_limit: int = 300_000) -> List[dict]:
+    """ Backtracking cronológico x conflict-directed backjumping (com e sem nogoods) em grafos
+    aleatórios perto da transição de fase da 3-coloração (grau médio ~4.6), onde metade das
+    instâncias tem solução e a busca mais sofre. Soma backtracks, tempo e abortos por node_limit."""
+    variants = {"cronológico": {}, "CBJ": {"backjump": True}, "CBJ + nogoods": {"backjump": True}}
+    totals = {name: {"variant": name, "backtracks": 0, "skipped": 0, "learned": 0, "elapsed": 0.0,
+                     "aborted": 0} for name in variants}
+    for seed in range(seeds):
+        adjacency = CompiledGraph.from_graph(random_graph(n, avg_degree, seed)).adjacency()
+        for name, options in variants.items():
+            nogoods = NogoodStore() if name == "CBJ + nogoods" else None
+            _, stats = search_coloring(adjacency, n_colors, mrv=mrv, lcv=mrv, propagation='fc',
+                                       node_limit=node_limit, nogoods=nogoods, **options)
+            total = totals[name]
+            total["backtracks"] += stats.backtracks
+            total["skipped"] += stats.skipped
+            total["learned"] += stats.learned
+            total["elapsed"] += stats.elapsed
+            total["aborted"] += stats.aborted
+    order = "MRV + LCV" if mrv else "ordem fixa"
+    print(f"{seeds} grafos n={n} grau={avg_degree} k={n_colors}, {order} + FC, limite de {node_limit} nós")
+    print(f"{'variante':16s} {'backtracks':>11s} {'pulados':>9s} {'nogoods':>8s} {'tempo (s)':>10s} {'limite':>7s}")
+    for total in totals.values():
+        print(f"{total['variant']:16s} {total['backtracks']:11d} {total['skipped']:9d} {total['learned']:8d} "
+              f"{total['elapsed']:10.2f} {total['aborted']:7d}")
+    return list(totals.values())
+
+
+def benchmark_cold_start(repeats: int = 5) -> Dict[str, float]:
+    """ Tempo de parede (mediana de `repeats` processos novos) para:
+    - importar backtracking como biblioteca (sem networkx/matplotlib)
+    - resolver o mapa das UFs pela linha de comando, sem desenhar
+    - o mesmo, renderizando o desenho em arquivo (carrega networkx e matplotlib)
+    - importar networkx + matplotlib.pyplot, o custo que a importação tinha antes"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, 'backtracking.py')
+    output = os.path.join(tempfile.gettempdir(), 'uf_coloring.png')
+    commands = {
+        "import backtracking": [sys.executable, '-c', 'import backtracking'],
+        "CLI sem desenho": [sys.executable, script, '--no-draw', '--quiet'],
+        "CLI com desenho em arquivo": [sys.executable, script, '--quiet', '--output', output],
+        "import networkx + pyplot": [sys.executable, '-c', 'import networkx, matplotlib.pyplot'],
+    }
+    result = {}
+    for name, command in commands.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=here, check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        result[name] = statistics.median(times)
+        print(f"{name:28s} {result[name]:7.3f} s")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos resolvedores de coloração de grafos")
+    parser.add_argument('--instance', action='append', default=[], metavar='ARQUIVO:CORES',
+                        help="instância de arquivo (.col, .json ou lista de arestas); pode repetir")
+    parser.add_argument('--no-default', action='store_true', help="não roda as instâncias geradas")
+    parser.add_argument('--quick', action='store_true', help="versão reduzida das instâncias geradas")
+    parser.add_argument('--solver', action='append', choices=list(SOLVERS), help="restringe os resolvedores")
+    parser.add_argument('--node-limit', type=int, default=200_000)
+    parser.add_argument('--time-limit', type=float, default=10.0, help="limite do min-conflicts (s)")
+    parser.add_argument('--no-memory', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--out', help="arquivo de resultados (.json ou .csv)")
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'),
+                        help="compara dois arquivos de resultados e sai")
+    parser.add_argument('--graph-access', action='store_true',
+                        help="mede o custo do teste de conflito networkx x compilado (10^5 nós)")
+    parser.add_argument('--backjumping', action='store_true',
+                        help="compara backtracking cronológico e backjumping na transição de fase")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="mede o tempo de inicialização do módulo e da linha de comando")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    if args.graph_access:
+        benchmark_graph_access(100_000)
+        return
+    if args.cold_start:
+        benchmark_cold_start()
+        return
+    if args.backjumping:
+        compare_backjumping(60, node_limit=args.node_limit)
+        compare_backjumping(150, mrv=True, node_limit=args.node_limit)
+        return
+    instances = [] if args.no_default else default_suite(args.quick)
+    instances += [file_instance(spec) for spec in args.instance]
+    solvers = {name: SOLVERS[name] for name in args.solver} if args.solver else SOLVERS
+    rows = run_suite(instances, solvers, args.node_limit, args.time_limit, not args.no_memory)
+    if args.out and rows:
+        write_results(rows, args.out)
+        print(f"Resultados gravados em {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
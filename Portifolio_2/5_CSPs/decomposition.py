@@ -0,0 +1,290 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from backtracking import search_coloring
+from compiled_graph import CompiledGraph
+
+####### Pré-processamento estrutural para a coloração ########
+# Antes de buscar, o grafo é simplificado:
+#   1. nós com grau < k são retirados (repetidamente) e coloridos por último: quando um
+#      deles volta, tem menos de k vizinhos coloridos, então sempre sobra uma cor
+#   2. o que sobra (o "núcleo") é dividido em componentes conexas independentes
+#   3. cada componente é resolvida pelo caminho mais barato:
+#      - árvore: algoritmo de CSP em árvore, linear, sem busca
+#      - poucos nós fecham todos os ciclos (cutset pequeno): condicionamento no cutset,
+#        cada atribuição do cutset deixa uma floresta resolvida em tempo linear; só é usado
+#        quando k^|cutset| <= m, para o custo total ficar limitado
+#      - demais: backtracking com MRV/LCV/MAC (search_coloring)
+#   Componentes grandes são resolvidas em paralelo em um pool de processos.
+
+
+@dataclass
+class DecompositionStats:
+    peeled: int = 0              # nós retirados por terem grau < k
+    components: int = 0          # componentes conexas do núcleo
+    tree_components: int = 0     # resolvidas pelo algoritmo de árvore
+    cutset_components: int = 0   # resolvidas por condicionamento no cutset
+    search_components: int = 0   # resolvidas por backtracking
+    nodes_visited: int = 0       # atribuições tentadas (busca e cutset)
+    backtracks: int = 0          # soma dos backtracks das buscas
+    elapsed: float = 0.0
+    aborted: bool = False        # True se alguma componente parou por node_limit
+
+
+def peel_low_degree(adjacency: Sequence[Sequence[int]], n_colors: int) -> Tuple[List[bool], List[int]]:
+    """ Retira repetidamente os nós com grau < n_colors (contando só vizinhos não retirados).
+    Retorna (in_core: se o nó ficou no núcleo, ordem de retirada)."""
+    n = len(adjacency)
+    degree = [len(neighbors) for neighbors in adjacency]
+    in_core = [True] * n
+    queue = deque(v for v in range(n) if degree[v] < n_colors)
+    for v in queue:
+        in_core[v] = False
+    removed = []
+    while queue:
+        v = queue.popleft()
+        removed.append(v)
+        for u in adjacency[v]:
+            if in_core[u]:
+                degree[u] -= 1
+                if degree[u] < n_colors:
+                    in_core[u] = False
+                    queue.append(u)
+    return in_core, removed
+
+
+def connected_components(adjacency: Sequence[Sequence[int]], active: Sequence[bool]) -> List[List[int]]:
+    """ Componentes conexas do subgrafo induzido pelos nós ativos (busca em largura)."""
+    seen = [not a for a in active]
+    components = []
+    for start in range(len(adjacency)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        for v in component:  # a lista cresce durante o laço (fila da BFS)
+            for u in adjacency[v]:
+                if not seen[u]:
+                    seen[u] = True
+                    component.append(u)
+        components.append(component)
+    return components
+
+
+def color_forest(adjacency: Sequence[Sequence[int]], nodes: Sequence[int], domains: List[int],
+                 active: Sequence[bool]) -> bool:
+    """ CSP de diferença em uma floresta, em tempo linear (sem busca):
+    - de baixo para cima, a cor c sai do pai se o domínio do filho for só {c}
+      (consistência de arco direcional)
+    - de cima para baixo, cada nó pega uma cor do domínio diferente da do pai
+    `active` restringe as arestas consideradas; os domínios (bitmasks) viram a cor final,
+    um único bit por nó. Retorna False se não houver coloração."""
+    parent: Dict[int, int] = {}
+    order: List[int] = []
+    for root in nodes:
+        if root in parent:
+            continue
+        parent[root] = -1
+        start = len(order)
+        order.append(root)
+        i = start
+        while i < len(order):
+            v = order[i]
+            i += 1
+            for u in adjacency[v]:
+                if active[u] and u not in parent:
+                    parent[u] = v
+                    order.append(u)
+    for v in reversed(order):
+        d, p = domains[v], parent[v]
+        if not d:
+            return False
+        if p >= 0 and not d & (d - 1) and domains[p] & d:
+            domains[p] ^= d
+    for v in order:
+        d, p = domains[v], parent[v]
+        if p >= 0:
+            d &= ~domains[p]
+        if not d:
+            return False
+        domains[v] = d & -d  # menor cor restante
+    return True
+
+
+def find_cycle_cutset(adjacency: Sequence[Sequence[int]], component: Sequence[int],
+                      max_size: int) -> Optional[List[int]]:
+    """ Cutset de ciclos guloso: descarta nós de grau <= 1 (não estão em ciclos) e, enquanto
+    sobrar algo, move para o cutset o nó de maior grau. Retorna None se passar de max_size."""
+    members = set(component)
+    degree = {v: sum(1 for u in adjacency[v] if u in members) for v in component}
+    alive = set(component)
+    cutset: List[int] = []
+
+    def remove(v: int) -> None:
+        alive.discard(v)
+        for u in adjacency[v]:
+            if u in alive:
+                degree[u] -= 1
+
+    while True:
+        queue = [v for v in alive if degree[v] <= 1]
+        while queue:
+            v = queue.pop()
+            if v not in alive:
+                continue
+            remove(v)
+            queue.extend(u for u in adjacency[v] if u in alive and degree[u] <= 1)
+        if not alive:
+            return cutset
+        if len(cutset) == max_size:
+            return None
+        v = max(alive, key=degree.__getitem__)
+        cutset.append(v)
+        remove(v)
+
+
+def _cutset_conditioning(adjacency: Sequence[Sequence[int]], cutset: List[int], n_colors: int,
+                         node_limit: Optional[int] = None) -> Tuple[Optional[List[int]], int, bool]:
+    """ Enumera as colorações consistentes do cutset; para cada uma, o resto da componente
+    (nós 0..m-1) é uma floresta com domínios reduzidos, resolvida por color_forest.
+    Custo O(k^|cutset| * m). Cada cor tentada em um nó do cutset conta como um nó visitado
+    para node_limit. Retorna (cores ou None, nós visitados, True se parou por node_limit)."""
+    m = len(adjacency)
+    visited = 0
+    aborted = False
+    full = (1 << n_colors) - 1
+    active = [True] * m
+    for v in cutset:
+        active[v] = False
+    rest = [v for v in range(m) if active[v]]
+    assignment: Dict[int, int] = {}
+
+    def extend(i: int) -> Optional[List[int]]:
+        nonlocal visited, aborted
+        if i == len(cutset):
+            domains = [full] * m
+            for c, color in assignment.items():
+                for u in adjacency[c]:
+                    domains[u] &= ~(1 << color)
+            if not color_forest(adjacency, rest, domains, active):
+                return None
+            result = [d.bit_length() - 1 for d in domains]
+            for c, color in assignment.items():
+                result[c] = color
+            return result
+        v = cutset[i]
+        used = {assignment[u] for u in adjacency[v] if u in assignment}
+        for color in range(n_colors):
+            if color not in used:
+                if node_limit is not None and visited >= node_limit:
+                    aborted = True
+                    return None
+                visited += 1
+                assignment[v] = color
+                found = extend(i + 1)
+                if found is not None:
+                    return found
+                del assignment[v]
+                if aborted:
+                    return None
+        return None
+
+    result = extend(0)
+    return result, visited, aborted
+
+
+def _solve_component(adjacency: List[Tuple[int, ...]], n_colors: int, propagation: str, max_cutset: int,
+                     node_limit: Optional[int]) -> Tuple[Optional[List[int]], str, int, int, bool]:
+    """ Resolve uma componente já renumerada de 0 a m-1 (roda também em outro processo).
+    Retorna (cores ou None, método usado, nós visitados, backtracks, True se parou por node_limit)."""
+    m = len(adjacency)
+    edges = sum(len(neighbors) for neighbors in adjacency) // 2
+    everyone = [True] * m
+    nodes = list(range(m))
+    if edges == m - 1:
+        domains = [(1 << n_colors) - 1] * m
+        if not color_forest(adjacency, nodes, domains, everyone):
+            return None, 'tree', 0, 0, False
+        return [d.bit_length() - 1 for d in domains], 'tree', 0, 0, False
+    cutset = find_cycle_cutset(adjacency, nodes, max_cutset) if max_cutset > 0 else None
+    # O condicionamento só compensa se as k^|cutset| florestas não custarem mais que O(m^2)
+    if cutset is not None and n_colors ** len(cutset) <= m:
+        colors, visited, aborted = _cutset_conditioning(adjacency, cutset, n_colors, node_limit)
+        return colors, 'cutset', visited, 0, aborted
+    colors, stats = search_coloring(adjacency, n_colors, propagation=propagation, node_limit=node_limit)
+    return colors, 'search', stats.nodes_visited, stats.backtracks, stats.aborted
+
+
+def _subgraph(adjacency: Sequence[Sequence[int]], component: List[int]) -> List[Tuple[int, ...]]:
+    """ Adjacência da componente renumerada de 0 a m-1 (vizinhos fora dela são ignorados)."""
+    local = {v: i for i, v in enumerate(component)}
+    return [tuple(local[u] for u in adjacency[v] if u in local) for v in component]
+
+
+def decomposed_coloring(graph, colors: list, peel: bool = True, max_cutset: int = 8,
+                        propagation: str = 'mac', workers: Optional[int] = None,
+                        parallel_threshold: int = 2_000, node_limit: Optional[int] = None
+                        ) -> Tuple[Optional[Dict[Hashable, object]], DecompositionStats]:
+    """ Coloração com pré-processamento estrutural (ver o topo do módulo).
+    Componentes com ao menos parallel_threshold nós vão para um pool de processos quando
+    há mais de uma delas; as menores são resolvidas no próprio processo.
+    node_limit vale para cada componente; se alguma parar por ele, stats.aborted fica True.
+    Aceita nx.Graph, dict de adjacência ou CompiledGraph. Retorna ({nó: cor} ou None, estatísticas)."""
+    start = time.perf_counter()
+    compiled = graph if isinstance(graph, CompiledGraph) else CompiledGraph.from_graph(graph)
+    adjacency = compiled.adjacency()
+    n, k = len(adjacency), len(colors)
+    stats = DecompositionStats()
+
+    if peel:
+        in_core, removed = peel_low_degree(adjacency, k)
+    else:
+        in_core, removed = [True] * n, []
+    stats.peeled = len(removed)
+    components = connected_components(adjacency, in_core)
+    stats.components = len(components)
+
+    color = [-1] * n
+    large = [c for c in components if len(c) >= parallel_threshold]
+    jobs = [(component, _subgraph(adjacency, component)) for component in components]
+    args = (k, propagation, max_cutset, node_limit)
+    if len(large) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers or min(len(large), os.cpu_count() or 1)) as pool:
+            futures = {id(component): pool.submit(_solve_component, local, *args)
+                       for component, local in jobs if len(component) >= parallel_threshold}
+            results = [futures[id(component)].result() if id(component) in futures
+                       else _solve_component(local, *args) for component, local in jobs]
+    else:
+        results = [_solve_component(local, *args) for _, local in jobs]
+
+    for (component, _), (local_colors, method, visited, backtracks, aborted) in zip(jobs, results):
+        stats.nodes_visited += visited
+        stats.backtracks += backtracks
+        stats.aborted = stats.aborted or aborted
+        if method == 'tree':
+            stats.tree_components += 1
+        elif method == 'cutset':
+            stats.cutset_components += 1
+        else:
+            stats.search_components += 1
+        if local_colors is None:
+            stats.elapsed = time.perf_counter() - start
+            return None, stats
+        for v, c in zip(component, local_colors):
+            color[v] = c
+
+    # Devolve os nós retirados na ordem inversa: cada um tem < k vizinhos já coloridos
+    for v in reversed(removed):
+        used = 0
+        for u in adjacency[v]:
+            if color[u] >= 0:
+                used |= 1 << color[u]
+        free = ~used & ((1 << k) - 1)
+        color[v] = (free & -free).bit_length() - 1
+
+    stats.elapsed = time.perf_counter() - start
+    return {node: colors[c] for node, c in zip(compiled.nodes, color)}, stats
@@ -0,0 +1,176 @@
+import json
+import os
+import random
+from typing import Dict, Hashable, Iterable, Set
+
+####### Leitura, escrita e geração de grafos para os resolvedores de coloração ########
+
+# Grafos como dict {nó: conjunto de vizinhos}, aceito pelos resolvedores de coloração.
+Adjacency = Dict[Hashable, Set[Hashable]]
+
+
+def load_dimacs(path: str) -> Adjacency:
+    """ Lê um grafo no formato DIMACS de coloração (.col):
+        c comentário
+        p edge <n> <m>
+        e <u> <v>        (nós numerados de 1 a n)
+    Nós sem arestas também aparecem no resultado."""
+    graph: Adjacency = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0] == 'c':
+                continue
+            if parts[0] == 'p':
+                for node in range(1, int(parts[2]) + 1):
+                    graph.setdefault(node, set())
+            elif parts[0] == 'e':
+                u, v = int(parts[1]), int(parts[2])
+                if u != v:
+                    graph.setdefault(u, set()).add(v)
+                    graph.setdefault(v, set()).add(u)
+    return graph
+
+
+def _label(token: str) -> Hashable:
+    """ Rótulos numéricos viram int; os demais (ex.: siglas de UF) ficam como texto."""
+    return int(token) if token.lstrip('-').isdigit() else token
+
+
+def load_edge_list(path: str) -> Adjacency:
+    """ Lê uma lista de arestas em texto, uma aresta "u v" (ou "u,v") por linha.
+    Linhas vazias ou começando com '#' ou '%' são ignoradas; uma linha com um único
+    rótulo declara um nó isolado."""
+    graph: Adjacency = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.replace(',', ' ').split()
+            if not parts or parts[0][0] in '#%':
+                continue
+            u = _label(parts[0])
+            graph.setdefault(u, set())
+            if len(parts) > 1:
+                v = _label(parts[1])
+                if u != v:
+                    graph[u].add(v)
+                    graph.setdefault(v, set()).add(u)
+    return graph
+
+
+def load_json_adjacency(path: str) -> Adjacency:
+    """ Lê um json {nó: [vizinhos]} (formato de uf_neighbors.json), simetrizando as listas."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    graph: Adjacency = {}
+    for u, neighbors in data.items():
+        graph.setdefault(u, set())
+        for v in neighbors:
+            if u != v:
+                graph[u].add(v)
+                graph.setdefault(v, set()).add(u)
+    return graph
+
+
+def load_graph(path: str) -> Adjacency:
+    """ Escolhe o leitor pela extensão: .col (DIMACS), .json (adjacência) ou lista de arestas."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.col':
+        return load_dimacs(path)
+    if extension == '.json':
+        return load_json_adjacency(path)
+    return load_edge_list(path)
+
+
+def _edges(graph: Adjacency) -> Iterable[tuple]:
+    seen = set()
+    for u in graph:
+        seen.add(u)
+        for v in graph[u]:
+            if v not in seen:
+                yield u, v
+
+
+def write_dimacs(graph: Adjacency, path: str, comment: str = '') -> None:
+    """ Grava no formato DIMACS (.col), renumerando os nós de 1 a n na ordem do dict."""
+    index = {node: i for i, node in enumerate(graph, start=1)}
+    edges = list(_edges(graph))
+    with open(path, 'w', encoding='utf-8') as f:
+        if comment:
+            f.write(f"c {comment}\n")
+        f.write(f"p edge {len(index)} {len(edges)}\n")
+        for u, v in edges:
+            f.write(f"e {index[u]} {index[v]}\n")
+
+
+def write_edge_list(graph: Adjacency, path: str) -> None:
+    """ Grava como lista de arestas "u v"; nós isolados aparecem sozinhos na linha."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for u in graph:
+            if not graph[u]:
+                f.write(f"{u}\n")
+        for u, v in _edges(graph):
+            f.write(f"{u} {v}\n")
+
+
+########## GERADORES COM SEMENTE ##########
+
+
+def random_graph(n: int, avg_degree: float, seed: int = 0) -> Adjacency:
+    """ Grafo aleatório G(n, m) com m = n * avg_degree / 2 arestas."""
+    rng = random.Random(seed)
+    graph: Adjacency = {i: set() for i in range(n)}
+    edges = min(int(n * avg_degree / 2), n * (n - 1) // 2)
+    while edges > 0:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and v not in graph[u]:
+            graph[u].add(v)
+            graph[v].add(u)
+            edges -= 1
+    return graph
+
+
+def planar_graph(n: int, seed: int = 0) -> Adjacency:
+    """ Rede apoloniana aleatória: grafo planar maximal (triangulado), como mapas.
+    Começa com um triângulo e insere cada novo nó dentro de uma face sorteada,
+    ligando-o aos três vértices da face. Os nós são embaralhados no fim, para que a
+    ordem de inserção (que facilita a coloração gulosa) não fique exposta."""
+    rng = random.Random(seed)
+    graph: Dict[int, Set[int]] = {0: {1, 2}, 1: {0, 2}, 2: {0, 1}}
+    faces = [(0, 1, 2), (0, 1, 2)]  # as duas faces do triângulo inicial
+    for node in range(3, n):
+        i = rng.randrange(len(faces))
+        a, b, c = faces[i]
+        graph[node] = {a, b, c}
+        for v in (a, b, c):
+            graph[v].add(node)
+        faces[i] = (a, b, node)
+        faces.append((a, c, node))
+        faces.append((b, c, node))
+    relabel = list(range(len(graph)))
+    rng.shuffle(relabel)
+    return {relabel[u]: {relabel[v] for v in graph[u]} for u in sorted(graph, key=relabel.__getitem__)}
+
+
+def planar_grid_graph(rows: int, cols: int, seed: int = 0) -> Adjacency:
+    """ Grade triangulada: grade rows x cols com uma diagonal sorteada em cada quadrado
+    (planar, grau máximo 8, com estrutura de "mapa" mais regular que a apoloniana)."""
+    rng = random.Random(seed)
+    graph: Dict[int, Set[int]] = {r * cols + c: set() for r in range(rows) for c in range(cols)}
+
+    def link(u: int, v: int) -> None:
+        graph[u].add(v)
+        graph[v].add(u)
+
+    for r in range(rows):
+        for c in range(cols):
+            node = r * cols + c
+            if c + 1 < cols:
+                link(node, node + 1)
+            if r + 1 < rows:
+                link(node, node + cols)
+            if r + 1 < rows and c + 1 < cols:
+                if rng.random() < 0.5:
+                    link(node, node + cols + 1)
+                else:
+                    link(node + 1, node + cols)
+    return graph
@@ -0,0 +1,254 @@
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import Event
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from compiled_graph import CompiledGraph
+from graph_io import load_dimacs
+
+####### Busca local min-conflicts (com lista tabu e passeio aleatório) ########
+# Para grafos muito maiores que o das UFs o backtracking sistemático deixa de ser viável.
+# A busca local parte de uma coloração completa (com conflitos) e repete:
+#   1. sorteia um nó em conflito
+#   2. com probabilidade walk_prob troca para uma cor aleatória (passeio aleatório)
+#   3. senão escolhe a cor com menos conflitos que não esteja na lista tabu
+#      (a cor que o nó acabou de deixar fica tabu por alguns passos)
+# Os conflitos ficam em uma tabela incremental: counts[v * k + c] = vizinhos de v com cor c.
+# Mudar a cor de um nó só atualiza as linhas dos vizinhos, então cada passo custa O(grau).
+
+
+@dataclass
+class LocalSearchStats:
+    steps: int = 0             # movimentos feitos
+    conflicts: int = 0         # arestas em conflito no fim (0 = coloração válida)
+    best_conflicts: int = 0    # menor número de conflitos visto
+    restarts: int = 0          # reinícios executados (somando todos os processos)
+    elapsed: float = 0.0
+
+
+# Sinal compartilhado entre os processos: um reinício que resolve avisa os demais
+_STOP_EVENT = None
+
+
+def _init_worker(stop_event) -> None:
+    global _STOP_EVENT
+    _STOP_EVENT = stop_event
+
+
+class _MinConflicts:
+    def __init__(self, adjacency: Sequence[Sequence[int]], n_colors: int, seed: int):
+        self.adjacency = adjacency
+        self.k = n_colors
+        self.rng = random.Random(seed)
+        n = len(adjacency)
+        # Atribuição inicial gulosa: cada nó recebe a cor menos usada pelos vizinhos já
+        # coloridos (empates sorteados, então cada semente parte de um ponto diferente)
+        self.color = array('i', [-1]) * n
+        for v in range(n):
+            used = [0] * n_colors
+            for u in adjacency[v]:
+                if self.color[u] >= 0:
+                    used[self.color[u]] += 1
+            fewest = min(used)
+            choices = [c for c in range(n_colors) if used[c] == fewest]
+            self.color[v] = choices[self.rng.randrange(len(choices))]
+        self.counts = array('i', [0]) * (n * n_colors)
+        for v in range(n):
+            for u in adjacency[v]:
+                self.counts[v * n_colors + self.color[u]] += 1
+        # Conjunto de nós em conflito com remoção O(1): lista + posição de cada nó
+        self.conflicted: List[int] = []
+        self.position = array('i', [-1]) * n
+        self.conflicts = 0
+        for v in range(n):
+            own = self.counts[v * n_colors + self.color[v]]
+            if own:
+                self._mark(v)
+                self.conflicts += own
+        self.conflicts //= 2  # cada aresta foi contada pelos dois extremos
+        self.steps = 0
+
+    def _mark(self, v: int) -> None:
+        if self.position[v] < 0:
+            self.position[v] = len(self.conflicted)
+            self.conflicted.append(v)
+
+    def _unmark(self, v: int) -> None:
+        i = self.position[v]
+        if i >= 0:
+            last = self.conflicted.pop()
+            if last != v:
+                self.conflicted[i] = last
+                self.position[last] = i
+            self.position[v] = -1
+
+    def move(self, v: int, new: int) -> None:
+        """ Troca a cor de v e atualiza contadores e conjunto de conflitos em O(grau)."""
+        k, counts, color = self.k, self.counts, self.color
+        old = color[v]
+        self.conflicts += counts[v * k + new] - counts[v * k + old]
+        color[v] = new
+        for u in self.adjacency[v]:
+            base = u * k
+            counts[base + old] -= 1
+            counts[base + new] += 1
+            cu = color[u]
+            if cu == old and counts[base + old] == 0:
+                self._unmark(u)
+            elif cu == new:
+                self._mark(u)
+        if counts[v * k + new]:
+            self._mark(v)
+        else:
+            self._unmark(v)
+
+    def run(self, max_steps: int, deadline: float, walk_prob: float, tabu_tenure: int) -> int:
+        """ Executa até zerar os conflitos, esgotar os passos ou passar do prazo (time.time()).
+        Retorna o menor número de conflitos visto (a coloração atual fica em self.color)."""
+        rng, k, counts, color = self.rng, self.k, self.counts, self.color
+        if k < 2:
+            return self.conflicts  # com uma cor não há movimento possível
+        tabu_until = array('q', [0]) * len(self.counts)
+        best = self.conflicts
+        best_color = array('i', color)
+        step = 0
+        while self.conflicted and step < max_steps:
+            if step & 1023 == 0 and (time.time() > deadline or
+                                     (_STOP_EVENT is not None and _STOP_EVENT.is_set())):
+                break
+            step += 1
+            v = self.conflicted[rng.randrange(len(self.conflicted))]
+            old = color[v]
+            base = v * k
+            if rng.random() < walk_prob:
+                new = rng.randrange(k - 1)
+                new += new >= old  # cor aleatória diferente da atual
+            else:
+                # Cor com menos conflitos (empates sorteados), podendo ficar na atual.
+                # Cores tabu só entram se melhorarem o melhor resultado (aspiração).
+                current = counts[base + old]
+                fewest, choices = current, [old]
+                for c in range(k):
+                    if c == old:
+                        continue
+                    count = counts[base + c]
+                    if count > fewest:
+                        continue
+                    if tabu_until[base + c] > step and self.conflicts - current + count >= best:
+                        continue
+                    if count < fewest:
+                        fewest, choices = count, [c]
+                    else:
+                        choices.append(c)
+                new = choices[rng.randrange(len(choices))]
+                if new == old:
+                    continue
+            tabu_until[base + old] = step + tabu_tenure + rng.randrange(10)
+            self.move(v, new)
+            if self.conflicts < best:
+                best = self.conflicts
+                best_color[:] = color
+        if self.conflicts > best:
+            self.color[:] = best_color
+            self.conflicts = best
+        self.steps = step
+        return best
+
+
+def _restart_worker(adjacency: Sequence[Sequence[int]], n_colors: int, seed: int, max_steps: int,
+                    deadline: float, walk_prob: float, tabu_tenure: int) -> Tuple[int, int, List[int]]:
+    """ Um reinício independente (executado em outro processo). Retorna (conflitos, passos, cores).
+    deadline é um instante de time.time(), comum a todos os processos."""
+    search = _MinConflicts(adjacency, n_colors, seed)
+    conflicts = search.run(max_steps, deadline, walk_prob, tabu_tenure)
+    if conflicts == 0 and _STOP_EVENT is not None:
+        _STOP_EVENT.set()
+    return conflicts, search.steps, list(search.color)
+
+
+def min_conflicts_coloring(graph, colors: list, time_limit: float = 10.0, restarts: int = 4,
+                           workers: Optional[int] = None, max_steps: int = 10_000_000,
+                           walk_prob: float = 0.02, tabu_tenure: int = 10, seed: int = 0
+                           ) -> Tuple[Optional[Dict[Hashable, object]], LocalSearchStats]:
+    """ Coloração por min-conflicts com lista tabu e passeio aleatório.
+    Roda `restarts` buscas independentes (sementes diferentes) em paralelo em um pool de
+    processos, todas com o mesmo prazo de time_limit segundos; a primeira que zerar os
+    conflitos encerra as demais.
+    Aceita nx.Graph, dict de adjacência ou CompiledGraph.
+    Retorna ({nó: cor} ou None se não zerou os conflitos no tempo, estatísticas)."""
+    compiled = graph if isinstance(graph, CompiledGraph) else CompiledGraph.from_graph(graph)
+    adjacency = compiled.adjacency()
+    stats = LocalSearchStats()
+    start = time.perf_counter()
+    best: Optional[Tuple[int, int, List[int]]] = None
+    # Prazo único para todos os reinícios, medido no relógio de parede compartilhado
+    args = (len(colors), max_steps, time.time() + time_limit, walk_prob, tabu_tenure)
+    if restarts <= 1 or workers == 1:
+        for r in range(max(restarts, 1)):
+            result = _restart_worker(adjacency, args[0], seed + r, *args[1:])
+            stats.restarts += 1
+            stats.steps += result[1]
+            if best is None or result[0] < best[0]:
+                best = result
+            if best[0] == 0:
+                break
+    else:
+        stop_event = Event()
+        with ProcessPoolExecutor(max_workers=workers or min(restarts, os.cpu_count() or 1),
+                                 initializer=_init_worker, initargs=(stop_event,)) as pool:
+            pending = {pool.submit(_restart_worker, adjacency, args[0], seed + r, *args[1:])
+                       for r in range(restarts)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    stats.restarts += 1
+                    stats.steps += result[1]
+                    if best is None or result[0] < best[0]:
+                        best = result
+                if best is not None and best[0] == 0:
+                    # Resolvido: os reinícios na fila são cancelados e os que estão
+                    # rodando param no próximo teste do sinal
+                    stop_event.set()
+                    for future in pending:
+                        future.cancel()
+    stats.elapsed = time.perf_counter() - start
+    stats.conflicts = stats.best_conflicts = best[0]
+    if best[0] > 0:
+        return None, stats
+    return {node: colors[c] for node, c in zip(compiled.nodes, best[2])}, stats
+
+
+def benchmark_dimacs(instances: List[Tuple[str, int]], time_limit: float = 30.0,
+                     restarts: int = 4) -> List[dict]:
+    """ Roda o min-conflicts em instâncias DIMACS (.col) locais: lista de (arquivo, cores)."""
+    results = []
+    for path, k in instances:
+        name = os.path.basename(path)
+        compiled = CompiledGraph.from_graph(load_dimacs(path))
+        coloring, stats = min_conflicts_coloring(compiled, list(range(k)), time_limit=time_limit,
+                                                 restarts=restarts)
+        print(f"{name:24s} n={len(compiled):6d} m={compiled.n_edges:8d} k={k:3d} | "
+              f"conflitos={stats.conflicts:5d} passos={stats.steps:9d} "
+              f"tempo={stats.elapsed:7.2f}s {'ok' if coloring else 'não resolvido'}")
+        results.append({"instance": name, "n": len(compiled), "edges": compiled.n_edges, "k": k,
+                        "conflicts": stats.conflicts, "steps": stats.steps,
+                        "elapsed": stats.elapsed, "solved": coloring is not None})
+    return results
+
+
+if __name__ == "__main__":
+    # Uso: python min_conflicts.py arquivo.col:k [arquivo2.col:k ...]
+    # Ex.: python min_conflicts.py dimacs/le450_15c.col:15 dimacs/flat300_28_0.col:31
+    # Instâncias em https://mat.tepper.cmu.edu/COLOR/instances.html
+    if len(sys.argv) < 2:
+        print("Uso: python min_conflicts.py arquivo.col:k [arquivo2.col:k ...]")
+        sys.exit(1)
+    benchmark_dimacs([(path, int(k)) for path, k in (arg.rsplit(':', 1) for arg in sys.argv[1:])])
@@ -1,103 +1,599 @@
-from typing import Dict, List, Tuple
+import re
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+Fact = Hashable  # ('selic', 'alta') ou uma conclusão como 'investimento_tesouro_direto'
+Rule = Tuple[List[Fact], Fact]   # (premissas, conclusão)
+Bindings = Dict[str, Hashable]   # variável ('?ativo') -> valor
+
+VARIABLE = re.compile(r'\?\w+')
+
+
+def _is_variable(term) -> bool:
+    return isinstance(term, str) and term.startswith('?')
+
+
+def _substitute(term, bindings: Bindings):
+    """ Troca as variáveis ligadas pelos valores (as demais ficam): um elemento de tupla que
+    é uma variável vira o valor; em texto ('investimento_?ativo') a troca é textual."""
+    if isinstance(term, tuple):
+        return tuple(_substitute(t, bindings) for t in term)
+    if isinstance(term, str) and '?' in term:
+        if term in bindings:
+            return bindings[term]
+        return VARIABLE.sub(lambda m: str(bindings.get(m.group(), m.group())), term)
+    return term
+
+
+def _match(template, value, bindings: Bindings) -> Optional[Bindings]:
+    """ Casa um termo com variáveis (premissa ou conclusão) com um termo ground; devolve as
+    ligações estendidas ou None. Variáveis dentro de texto ('investimento_?ativo') casam com
+    pedaços do texto, e os valores ligados assim são strings."""
+    if _is_variable(template) and VARIABLE.fullmatch(template):
+        if template in bindings:
+            return bindings if bindings[template] == value else None
+        return {**bindings, template: value}
+    if isinstance(template, tuple):
+        if not isinstance(value, tuple) or len(template) != len(value):
+            return None
+        for t, v in zip(template, value):
+            bindings = _match(t, v, bindings)
+            if bindings is None:
+                return None
+        return bindings
+    if isinstance(template, str) and '?' in template:
+        if not isinstance(value, str):
+            return None
+        regex, seen = [], {}
+        position = 0
+        for m in VARIABLE.finditer(template):
+            regex.append(re.escape(template[position:m.start()]))
+            name = m.group()
+            if name in bindings:
+                regex.append(re.escape(str(bindings[name])))
+            elif name in seen:
+                regex.append(f'(?P={seen[name]})')
+            else:
+                seen[name] = f'v{len(seen)}'
+                regex.append(f'(?P<{seen[name]}>.+?)')
+            position = m.end()
+        regex.append(re.escape(template[position:]))
+        found = re.fullmatch(''.join(regex), value)
+        if found is None:
+            return None
+        return {**bindings, **{name: found.group(group) for name, group in seen.items()}}
+    return bindings if template == value else None
+
+
+def _variables(term) -> set:
+    if isinstance(term, tuple):
+        return set().union(*map(_variables, term)) if term else set()
+    return set(VARIABLE.findall(term)) if isinstance(term, str) else set()
 
 
 class SmartInvestor:
+    """ Banco de conhecimentos com encadeamento para frente por contadores (estilo Rete):
+    - cada regra é indexada pelos fatos das suas premissas
+    - cada regra guarda quantas premissas ainda não são fatos (missing)
+    - um fato novo só visita as regras que o mencionam; a regra que chega a zero entra na
+      agenda e, ao disparar, adiciona a conclusão (que por sua vez visita as suas regras)
+    Cada regra dispara no máximo uma vez por fato novo, então inferir custa
+    O(regras + premissas), em vez de O(passadas × regras × premissas).
+
+    Manutenção da verdade: fatos afirmados (add_fact) e derivados ficam separados. O suporte
+    de um fato derivado são as regras que o concluem com todas as premissas satisfeitas
+    (justification). Ao remover um fato ou uma regra, as consequências que perderam suporte
+    são retiradas na hora (ver _retract); ao adicionar, só as consequências novas são
+    derivadas, no próximo infer/ask.
+
+    Consulta dirigida ao objetivo: ask(query, backward=True) encadeia para trás, expandindo só
+    as regras que concluem o objetivo (ver _prove). Usa o mesmo conjunto de fatos: o que é
+    provado entra em self.facts como derivado (e continua sob a manutenção da verdade).
+
+    Cada regra tem um id estável (devolvido por add_rule); a mesma regra adicionada de novo
+    (mesmo conjunto de premissas e mesma conclusão) devolve o id existente. Os índices por
+    premissa, por conclusão e por assinatura deixam adicionar, remover e buscar regras em O(1)
+    amortizado (fora o tamanho da própria regra).
+
+    Regras com variáveis (add_pattern_rule): premissas como ('?ativo', 'alto') casam com
+    qualquer fato da mesma aridade, e a conclusão recebe os valores. Cada fato novo só é
+    comparado com as premissas indexadas por uma das suas constantes (ver _match_patterns);
+    cada casamento completo vira uma regra ground comum (instância), então a inferência
+    incremental e a manutenção da verdade valem para elas sem mudança. No encadeamento para
+    trás, o objetivo é casado com as conclusões das regras com variáveis e as premissas
+    instanciadas são provadas como as de uma regra comum (ver _prove)."""
+
     def __init__(self):
-        # Armazena fatos como tuplas (nome, valor)
+        # Armazena fatos como tuplas (nome, valor): afirmados e derivados
         # Exemplo: ('selic', 'alta')
         self.facts = set()
-        # Regras armazenadas como listas de premissas e conclusões
-        # Exemplo: [(['selic', 'alta'], 'investimento_tesouro_direto')]
-        self.rules = []
+        self._asserted = set()   # fatos adicionados com add_fact
+        # Regras por id: (premissas, conclusão)
+        # Exemplo: {0: ([('selic', 'alta')], 'investimento_tesouro_direto')}
+        self._rules: Dict[int, Rule] = {}
+        self._next_rule = 0
+        self._signatures: Dict[Tuple[FrozenSet[Fact], Fact], int] = {}   # (premissas, conclusão) -> id
+        self._by_premise: Dict[Fact, Set[int]] = {}       # fato -> regras que o têm como premissa
+        self._by_conclusion: Dict[Fact, Set[int]] = {}    # fato -> regras que o concluem
+        self._missing: Dict[int, int] = {}                # regra -> premissas que ainda não são fatos
+        self._agenda: List[int] = []                      # regras com todas as premissas satisfeitas
+        self._failed = set()   # objetivos que o encadeamento para trás não provou (vale até algo ser adicionado)
+        # Regras com variáveis: id -> (premissas, conclusão), e as instâncias criadas por cada uma
+        self._patterns: Dict[int, Rule] = {}
+        self._instances: Dict[int, Set[int]] = {}
+        self._owners: Dict[int, int] = {}   # instância -> quantas regras com variáveis a geraram
+        # (aridade, posição, constante) ou (aridade,) -> [(regra com variáveis, índice da premissa)]
+        self._pattern_index: Dict[tuple, List[Tuple[int, int]]] = {}
+        # Índice de fatos em tupla, só mantido enquanto houver regras com variáveis:
+        # (aridade, posição, valor) -> fatos, e (aridade,) -> fatos
+        self._fact_index: Optional[Dict[tuple, Set[Fact]]] = None
 
-    def add_fact(self, fact: Tuple[str, int]):
-        # Adiciona um fato ao banco de conhecimentos
+    @property
+    def rules(self) -> List[Rule]:
+        # Regras como lista de (premissas, conclusão), na ordem em que foram adicionadas
+        return list(self._rules.values())
+
+    def _make_true(self, fact: Fact) -> None:
+        # Fato passa a valer: desconta das regras que o usam
         self.facts.add(fact)
+        for rule in self._by_premise.get(fact, ()):
+            self._missing[rule] -= 1
+            if self._missing[rule] == 0:
+                self._agenda.append(rule)
+        # Depois dos contadores: as instâncias novas já nascem contando este fato
+        if self._fact_index is not None:
+            if isinstance(fact, tuple):
+                self._index_fact(fact)
+            self._match_patterns(fact)
+
+    def _retract(self, seeds: List[Fact]) -> None:
+        """ Retira os fatos derivados de `seeds` que perderam suporte (delete and rederive):
+        1. retira as sementes e, em cascata, as conclusões das regras que deixaram de estar
+           satisfeitas (afirmados nunca saem)
+        2. fatos retirados que ainda têm uma regra satisfeita voltam pela agenda, junto com
+           as consequências; assim ciclos (a -> b, b -> a) não se sustentam sozinhos
+        Ao final self.facts é exatamente o fecho dos fatos afirmados."""
+        removed = []
+        queue = [fact for fact in seeds if fact in self.facts and fact not in self._asserted]
+        while queue:
+            fact = queue.pop()
+            if fact not in self.facts:
+                continue
+            self.facts.discard(fact)
+            if self._fact_index is not None and isinstance(fact, tuple):
+                self._unindex_fact(fact)
+            removed.append(fact)
+            for rule in self._by_premise.get(fact, ()):
+                self._missing[rule] += 1
+                if self._missing[rule] == 1:
+                    # A regra estava satisfeita e deixou de estar: a conclusão perde esse suporte
+                    conclusion = self._rules[rule][1]
+                    if conclusion in self.facts and conclusion not in self._asserted:
+                        queue.append(conclusion)
+        for fact in removed:
+            for rule in self._by_conclusion.get(fact, ()):
+                if self._missing[rule] == 0:
+                    self._agenda.append(rule)
+        self.infer()
+
+    def justification(self, fact: Fact) -> List[Rule]:
+        # Regras que sustentam o fato agora (todas as premissas satisfeitas)
+        self.infer()
+        return [self._rules[rule] for rule in self._by_conclusion.get(fact, ()) if self._missing[rule] == 0]
+
+    def add_fact(self, fact: Tuple[str, int]):
+        # Adiciona (afirma) um fato; as consequências novas saem no próximo infer/ask
+        self._asserted.add(fact)
+        self._failed.clear()
+        if fact not in self.facts:
+            self._make_true(fact)
 
     def remove_fact(self, fact: tuple[str, int]):
-        # Remove um fato do banco de conhecimentos
-        self.facts.discard(fact)
+        # Remove um fato afirmado e as consequências que ficaram sem suporte.
+        # Um fato derivado não é removido diretamente: ele sai quando perde o suporte.
+        if fact not in self._asserted:
+            return
+        self._asserted.discard(fact)
+        self._retract([fact])
+
+    def get_rule(self, rule_id: int) -> Rule:
+        # (premissas, conclusão) da regra com esse id
+        if rule_id not in self._rules:
+            raise ValueError(f"Regra inexistente: id {rule_id}")
+        return self._rules[rule_id]
+
+    def rule_id(self, premise: List[Fact], conclusion: Fact) -> Optional[int]:
+        # Id da regra (premissas em qualquer ordem), ou None se ela não estiver na base
+        return self._signatures.get((frozenset(premise), conclusion))
+
+    def rules_for(self, conclusion: Fact) -> List[int]:
+        # Ids das regras que concluem o fato
+        return sorted(self._by_conclusion.get(conclusion, ()))
+
+    def _insert_rule(self, premise: List[Fact], conclusion: Fact) -> int:
+        # Registra a regra nos índices (sem inferir); regra repetida devolve o id existente
+        signature = (frozenset(premise), conclusion)
+        rule = self._signatures.get(signature)
+        if rule is not None:
+            return rule
+        rule = self._next_rule
+        self._next_rule += 1
+        self._signatures[signature] = rule
+        self._rules[rule] = (premise, conclusion)
+        distinct = signature[0]  # premissa repetida conta uma vez só
+        self._missing[rule] = sum(1 for fact in distinct if fact not in self.facts)
+        for fact in distinct:
+            self._by_premise.setdefault(fact, set()).add(rule)
+        self._by_conclusion.setdefault(conclusion, set()).add(rule)
+        if self._missing[rule] == 0:
+            self._agenda.append(rule)
+        return rule
 
-    def remove_rule(self, premise: str, conclusion: str):
-        # Remove uma regra do banco de conhecimentos
-        self.rules.remove((premise, conclusion))
+    def _delete_rule(self, rule: int) -> Optional[Fact]:
+        # Tira a regra dos índices; devolve a conclusão se a regra a sustentava
+        premise, conclusion = self._rules.pop(rule)
+        signature = (frozenset(premise), conclusion)
+        del self._signatures[signature]
+        supported = self._missing.pop(rule) == 0
+        for fact in signature[0]:
+            self._by_premise[fact].discard(rule)
+        self._by_conclusion[conclusion].discard(rule)
+        return conclusion if supported else None
 
-    def add_rule(self, premise: str, conclusion: str):
-        # Adiciona uma regra ao banco de conhecimentos
-        self.rules.append((premise, conclusion))
+    def add_rule(self, premise: List[Fact], conclusion: Fact) -> int:
+        # Adiciona uma regra ao banco de conhecimentos e devolve o seu id
+        self._failed.clear()
+        return self._insert_rule(premise, conclusion)
+
+    def add_rules(self, rules: Iterable[Rule]) -> List[int]:
+        # Adiciona várias regras de uma vez; devolve os ids na mesma ordem
+        self._failed.clear()
+        return [self._insert_rule(premise, conclusion) for premise, conclusion in rules]
+
+    def remove_rule(self, premise: List[Fact], conclusion: Fact):
+        # Remove uma regra do banco de conhecimentos (e o que só ela sustentava)
+        rule = self.rule_id(premise, conclusion)
+        if rule is None:
+            raise ValueError(f"Regra inexistente: {premise} -> {conclusion}")
+        self.remove_rule_id(rule)
+
+    def remove_rule_id(self, rule_id: int) -> None:
+        # Remove a regra pelo id (e o que só ela sustentava)
+        self.remove_rules([rule_id])
+
+    def remove_rules(self, rule_ids: Iterable[int]) -> None:
+        # Remove várias regras; as consequências sem suporte são retiradas numa passada só
+        rule_ids = set(rule_ids)
+        for rule in rule_ids:
+            if rule not in self._rules:
+                raise ValueError(f"Regra inexistente: id {rule}")
+        seeds = [conclusion for conclusion in map(self._delete_rule, rule_ids)
+                 if conclusion is not None]
+        if seeds:
+            self._retract(seeds)
+
+    def _index_fact(self, fact: tuple) -> None:
+        index = self._fact_index
+        index.setdefault((len(fact),), set()).add(fact)
+        for position, value in enumerate(fact):
+            index.setdefault((len(fact), position, value), set()).add(fact)
+
+    def _unindex_fact(self, fact: tuple) -> None:
+        index = self._fact_index
+        index[(len(fact),)].discard(fact)
+        for position, value in enumerate(fact):
+            index[(len(fact), position, value)].discard(fact)
+
+    @staticmethod
+    def _unify(pattern, fact, bindings: Bindings) -> Optional[Bindings]:
+        # Casa uma premissa com variáveis com um fato; devolve as ligações estendidas ou None
+        if not isinstance(pattern, tuple):
+            return bindings if pattern == fact else None
+        if not isinstance(fact, tuple) or len(pattern) != len(fact):
+            return None
+        extended = bindings
+        for term, value in zip(pattern, fact):
+            if _is_variable(term):
+                bound = extended.get(term, extended)
+                if bound is extended:
+                    if extended is bindings:
+                        extended = dict(bindings)
+                    extended[term] = value
+                elif bound != value:
+                    return None
+            elif term != value:
+                return None
+        return extended
+
+    def _candidates(self, pattern) -> Iterable[Fact]:
+        # Fatos que podem casar com a premissa: o menor balde entre as suas constantes
+        if not isinstance(pattern, tuple):
+            return (pattern,) if pattern in self.facts else ()
+        index = self._fact_index
+        best = index.get((len(pattern),), ())
+        for position, term in enumerate(pattern):
+            if not _is_variable(term):
+                bucket = index.get((len(pattern), position, term), ())
+                if len(bucket) < len(best):
+                    best = bucket
+        return tuple(best)
+
+    def _join(self, pattern: int, premises: List[Fact], skip: int, bindings: Bindings) -> None:
+        # Completa o casamento nas demais premissas e cria uma instância por casamento completo
+        partial = [(0, bindings)]
+        while partial:
+            k, bindings = partial.pop()
+            if k == skip:
+                k += 1
+            if k == len(premises):
+                conclusion = self._patterns[pattern][1]
+                ground = ([_substitute(p, bindings) for p in premises], _substitute(conclusion, bindings))
+                existing = self._signatures.get((frozenset(ground[0]), ground[1]))
+                if existing is None:
+                    rule = self._insert_rule(*ground)
+                    self._instances[pattern].add(rule)
+                    self._owners[rule] = 1
+                    self._failed.clear()
+                elif existing in self._owners and existing not in self._instances[pattern]:
+                    # Mesma instância gerada por outra regra com variáveis: fica até as duas saírem.
+                    # Uma regra ground adicionada com add_rule não vira instância.
+                    self._instances[pattern].add(existing)
+                    self._owners[existing] += 1
+                continue
+            premise = _substitute(premises[k], bindings)
+            for fact in self._candidates(premise):
+                extended = self._unify(premise, fact, bindings)
+                if extended is not None:
+                    partial.append((k + 1, extended))
+
+    def _match_patterns(self, fact: Fact) -> None:
+        # Fato novo: só as premissas indexadas por uma constante dele (ou sem constantes);
+        # um fato que não é tupla só casa com premissas iguais a ele
+        if not self._pattern_index:
+            return
+        if isinstance(fact, tuple):
+            keys = [(len(fact),)] + [(len(fact), position, value) for position, value in enumerate(fact)]
+        else:
+            keys = [('ground', fact)]
+        for key in keys:
+            for pattern, k in tuple(self._pattern_index.get(key, ())):
+                bindings = self._unify(self._patterns[pattern][0][k], fact, {})
+                if bindings is not None:
+                    self._join(pattern, self._patterns[pattern][0], k, bindings)
+
+    def add_pattern_rule(self, premise: List[Fact], conclusion: Fact) -> int:
+        """ Adiciona uma regra com variáveis ('?nome') e devolve o id dela. Exemplo:
+            add_pattern_rule([('?ativo', 'alto')], 'investimento_?ativo')
+        Toda variável da conclusão precisa aparecer nas premissas. As instâncias para os
+        fatos atuais são criadas na hora; as seguintes, conforme os fatos chegam."""
+        bound = set().union(*map(_variables, premise)) if premise else set()
+        if not premise or not _variables(conclusion) <= bound:
+            raise ValueError(f"Variáveis da conclusão sem premissa: {premise} -> {conclusion}")
+        pattern = self._next_rule
+        self._next_rule += 1
+        self._register_pattern(pattern, premise, conclusion)
+        self._failed.clear()
+        self._join(pattern, premise, -1, {})
+        return pattern
+
+    def _register_pattern(self, pattern: int, premise: List[Fact], conclusion: Fact) -> None:
+        # Registra a regra com variáveis nos índices, sem criar instâncias (usado também na
+        # carga de snapshots, que já trazem as instâncias)
+        if self._fact_index is None:
+            self._fact_index = {}
+            for fact in self.facts:
+                if isinstance(fact, tuple):
+                    self._index_fact(fact)
+        self._patterns[pattern] = (premise, conclusion)
+        self._instances[pattern] = set()
+        for k, term in enumerate(premise):
+            if isinstance(term, tuple):
+                # Indexa pela primeira constante (de preferência o primeiro argumento)
+                constants = [(len(term), i, t) for i, t in enumerate(term) if not _is_variable(t)]
+                key = constants[0] if constants else (len(term),)
+            else:
+                key = ('ground', term)   # casa só com o próprio fato (ver _match_patterns)
+            self._pattern_index.setdefault(key, []).append((pattern, k))
+
+    def remove_pattern_rule(self, pattern_id: int) -> None:
+        # Remove a regra com variáveis e todas as instâncias dela (e o que só elas sustentavam)
+        if pattern_id not in self._patterns:
+            raise ValueError(f"Regra com variáveis inexistente: id {pattern_id}")
+        premise, _ = self._patterns.pop(pattern_id)
+        for key in list(self._pattern_index):
+            entries = [entry for entry in self._pattern_index[key] if entry[0] != pattern_id]
+            if entries:
+                self._pattern_index[key] = entries
+            else:
+                del self._pattern_index[key]
+        orphans = []
+        for rule in self._instances.pop(pattern_id):
+            self._owners[rule] -= 1
+            if not self._owners[rule]:
+                del self._owners[rule]
+                if rule in self._rules:
+                    orphans.append(rule)
+        self.remove_rules(orphans)
+
+    def pattern_instances(self, pattern_id: int) -> List[int]:
+        # Ids das regras ground criadas pela regra com variáveis
+        return sorted(rule for rule in self._instances.get(pattern_id, ()) if rule in self._rules)
 
     def infer(self):
-        """Utiiza o modus ponens para inferir novos fatos com base nas regras e fatos existentes."""
-        # Aplica regras para inferir novos fatos
-        new_inferences = True
-        while new_inferences:
-            # Continua inferindo até que não haja mais novos fatos
-            new_inferences = False
-            for premise, conclusion in self.rules:
-                # Verifica se todas as premissas estão nos fatos
-                if all(fact in self.facts for fact in premise):
-                    # Adiciona a conclusão aos fatos se ainda não estiver presente
-                    if conclusion not in self.facts:
-                        self.facts.add(conclusion)
-                        new_inferences = True
-
-    def ask(self, query):
-        # Verifica se um fato está no banco de conhecimentos
+        """Utiiza o modus ponens para inferir novos fatos com base nas regras e fatos existentes.
+        Só processa a agenda: regras que ficaram satisfeitas desde a última inferência."""
+        agenda = self._agenda
+        while agenda:
+            rule = agenda.pop()
+            # A regra pode ter sido removida, ou uma premissa retirada, depois de entrar na agenda
+            if self._missing.get(rule) == 0:
+                conclusion = self._rules[rule][1]
+                if conclusion not in self.facts:
+                    # Adiciona a conclusão (e coloca na agenda as regras que ela completa)
+                    self._make_true(conclusion)
+
+    def _pattern_premises(self, goal: Fact) -> Tuple[List[List[Fact]], bool]:
+        """ Premissas instanciadas das regras com variáveis cuja conclusão casa com o objetivo.
+        Variáveis que não aparecem na conclusão só podem ser ligadas por fatos atuais; nesse
+        caso a lista pode estar incompleta e o segundo valor é False."""
+        expansions, exact = [], True
+        for premises, conclusion in self._patterns.values():
+            bindings = _match(conclusion, goal, {})
+            if bindings is None:
+                continue
+            partial = [bindings]
+            while partial:
+                bindings = partial.pop()
+                pending = [_substitute(p, bindings) for p in premises]
+                open_premises = [p for p in pending if _variables(p)]
+                if not open_premises:
+                    expansions.append(pending)   # ground: cada premissa será provada como objetivo
+                    continue
+                exact = False
+                # Liga as variáveis pela premissa aberta com menos fatos candidatos (e algum)
+                options = [(len(c), p, c) for p in open_premises for c in [self._candidates(p)] if c]
+                if not options:
+                    continue
+                _, premise, candidates = min(options, key=lambda option: option[0])
+                for fact in candidates:
+                    extended = self._unify(premise, fact, bindings)
+                    if extended is not None and extended is not bindings:   # ligou alguma variável
+                        partial.append(extended)
+        return expansions, exact
+
+    def _prove(self, query: Fact) -> bool:
+        """ Encadeamento para trás iterativo (busca em profundidade com pilha explícita).
+        Cada quadro é [objetivo, listas de premissas que o concluem, lista atual, premissa
+        atual, low, exato]; as listas vêm das regras ground e das regras com variáveis cuja
+        conclusão casa com o objetivo (_pattern_premises):
+        - premissa que já é fato passa direto; objetivo provado vira fato (memorizado)
+        - objetivo que falhou vai para self._failed, e não é expandido de novo
+        - premissa que já está na pilha é um ciclo: conta como falha nesse caminho, e low
+          guarda a profundidade do ancestral envolvido. A falha só é memorizada se não
+          depender de um objetivo ainda em aberto (low >= a própria profundidade) nem de
+          uma expansão incompleta de regra com variáveis (exato)."""
+        if query in self.facts:
+            return True
+        if query in self._failed:
+            return False
+        stack: List[list] = []
+        on_stack: Dict[Fact, int] = {}
+
+        def push(goal: Fact) -> None:
+            on_stack[goal] = len(stack)
+            alternatives = [self._rules[rule][0] for rule in self._by_conclusion.get(goal, ())]
+            exact = True
+            if self._patterns:
+                expansions, exact = self._pattern_premises(goal)
+                alternatives.extend(expansions)
+            stack.append([goal, alternatives, 0, 0, len(stack), exact])
+
+        push(query)
+        answer = None   # resultado do último objetivo resolvido
+        while stack:
+            frame = stack[-1]
+            goal, alternatives = frame[0], frame[1]
+            if answer is not None:
+                if answer:
+                    frame[3] += 1                  # premissa provada
+                else:
+                    frame[2], frame[3] = frame[2] + 1, 0   # a regra falhou: próxima
+                answer = None
+            descended = False
+            while frame[2] < len(alternatives):
+                premises = alternatives[frame[2]]
+                if frame[3] == len(premises):
+                    break                          # todas as premissas provadas
+                premise = premises[frame[3]]
+                if premise in self.facts:
+                    frame[3] += 1
+                elif premise in on_stack:
+                    frame[4] = min(frame[4], on_stack[premise])
+                    frame[2], frame[3] = frame[2] + 1, 0
+                elif premise in self._failed:
+                    frame[2], frame[3] = frame[2] + 1, 0
+                else:
+                    push(premise)
+                    descended = True
+                    break
+            if descended:
+                continue
+            stack.pop()
+            del on_stack[goal]
+            if frame[2] < len(alternatives):
+                self._make_true(goal)
+                answer = True
+            else:
+                if frame[4] >= len(stack) and frame[5]:
+                    self._failed.add(goal)
+                elif stack:
+                    stack[-1][4] = min(stack[-1][4], frame[4])
+                    stack[-1][5] = stack[-1][5] and frame[5]
+                answer = False
+        return answer
+
+    def ask(self, query, backward: bool = False):
+        # Verifica se um fato está no banco de conhecimentos.
+        # backward=True prova só o necessário para a consulta, sem inferir a base inteira.
+        if backward:
+            return self._prove(query)
         self.infer()
         return query in self.facts
 
 
-smart_investor = SmartInvestor()
-
-##### Fatos iniciais ######
-smart_investor.add_fact(('selic', 'alta'))  # porcentagem
-smart_investor.add_fact(('inflacao', 'alta'))  # porcentagem
-smart_investor.add_fact(('petroleo', 'alto'))  # dolar por barril
-smart_investor.add_fact(('dolar', 'alto'))  # porcentagem
-
-
-##### Regras de investimento######
-# alta selic
-smart_investor.add_rule([('selic', 'alta')], 'investimento_tesouro_direto')
-# alta inflacao e selic
-smart_investor.add_rule(
-    [('inflacao', 'alta')], 'investimento_tesouro_ipca')
-# alta petroleo
-smart_investor.add_rule([('petroleo', 'alto')], 'investimento_PETR4')
-# alta dolar
-smart_investor.add_rule([('dolar', 'alto')], 'investimento_ativo_dolar')
-# dolar e petroleo altos
-smart_investor.add_rule(
-    [('dolar', 'alto'), ('petroleo', 'alto')], 'investimento_petroleo_estrangeiro')
-
-
-##### Consultas ######
-print('Investir em Tesouro Direto?',
-      smart_investor.ask('investimento_tesouro_direto'))  # True
-print(smart_investor.facts)
-print('Investir em Tesouro IPCA?',
-      smart_investor.ask('investimento_tesouro_ipca'))  # True
-print('Investir em PETR4?', smart_investor.ask('investimento_PETR4'))  # True
-print('Investir em Ativo Dolar?',
-      smart_investor.ask('investimento_ativo_dolar'))  # True
-print('Investir em Petroleo Estrangeiro?',
-      smart_investor.ask('investimento_petroleo_estrangeiro'))  # True
-
-print('Investir em bitcoin?', smart_investor.ask(
-    'investimento_bitcoin'))  # False
-
-smart_investor.add_fact(('bitcoin', 'alto'))  # Adiciona fato sobre bitcoin
-# Adiciona regra sobre bitcoin
-smart_investor.add_rule([('bitcoin', 'alto')], 'investimento_bitcoin')
-print('Fato bitcoin alto adicionado.')
-print('Investir em bitcoin?', smart_investor.ask('investimento_bitcoin'))  # True
-
-# Remover fato sobre selic
-smart_investor.remove_fact(('selic', 'alta'))
-smart_investor.remove_rule(
-    [('selic', 'alta')], 'investimento_tesouro_direto')
-smart_investor.remove_fact(
-    ('investimento_tesouro_direto'))  # Recalcula inferências
-print('Fato selic alta removido.')
-print('Investir em Tesouro Direto?',
-      smart_investor.ask('investimento_tesouro_direto'))  # False
+if __name__ == "__main__":
+    smart_investor = SmartInvestor()
+
+    ##### Fatos iniciais ######
+    smart_investor.add_fact(('selic', 'alta'))  # porcentagem
+    smart_investor.add_fact(('inflacao', 'alta'))  # porcentagem
+    smart_investor.add_fact(('petroleo', 'alto'))  # dolar por barril
+    smart_investor.add_fact(('dolar', 'alto'))  # porcentagem
+
+    ##### Regras de investimento######
+    # alta selic
+    smart_investor.add_rule([('selic', 'alta')], 'investimento_tesouro_direto')
+    # alta inflacao e selic
+    smart_investor.add_rule(
+        [('inflacao', 'alta')], 'investimento_tesouro_ipca')
+    # alta petroleo
+    smart_investor.add_rule([('petroleo', 'alto')], 'investimento_PETR4')
+    # alta dolar
+    smart_investor.add_rule([('dolar', 'alto')], 'investimento_ativo_dolar')
+    # dolar e petroleo altos
+    smart_investor.add_rule(
+        [('dolar', 'alto'), ('petroleo', 'alto')], 'investimento_petroleo_estrangeiro')
+
+    ##### Consultas ######
+    print('Investir em Tesouro Direto?',
+          smart_investor.ask('investimento_tesouro_direto'))  # True
+    print(smart_investor.facts)
+    print('Investir em Tesouro IPCA?',
+          smart_investor.ask('investimento_tesouro_ipca'))  # True
+    print('Investir em PETR4?', smart_investor.ask('investimento_PETR4'))  # True
+    print('Investir em Ativo Dolar?',
+          smart_investor.ask('investimento_ativo_dolar'))  # True
+    print('Investir em Petroleo Estrangeiro?',
+          smart_investor.ask('investimento_petroleo_estrangeiro'))  # True
+
+    print('Investir em bitcoin?', smart_investor.ask(
+        'investimento_bitcoin'))  # False
+
+    smart_investor.add_fact(('bitcoin', 'alto'))  # Adiciona fato sobre bitcoin
+    # Adiciona regra sobre bitcoin
+    smart_investor.add_rule([('bitcoin', 'alto')], 'investimento_bitcoin')
+    print('Fato bitcoin alto adicionado.')
+    print('Investir em bitcoin?', smart_investor.ask('investimento_bitcoin'))  # True
+
+    # Remover fato sobre selic: a conclusão investimento_tesouro_direto perde o suporte e
+    # sai junto, sem precisar remover a regra ou o fato derivado à mão
+    smart_investor.remove_fact(('selic', 'alta'))
+    print('Fato selic alta removido.')
+    print('Investir em Tesouro Direto?',
+          smart_investor.ask('investimento_tesouro_direto'))  # False
+
+    # Regra com variável: qualquer indicador alto -> investir nele (uma regra em vez de uma por ativo)
+    smart_investor.add_pattern_rule([('?ativo', 'alto')], 'investimento_?ativo')
+    print('Investir em petroleo?', smart_investor.ask('investimento_petroleo'))  # True
+    smart_investor.add_fact(('ouro', 'alto'))
+    print('Fato ouro alto adicionado.')
+    print('Investir em ouro?', smart_investor.ask('investimento_ouro'))  # True
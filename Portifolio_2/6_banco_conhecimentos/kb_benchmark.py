@@ -0,0 +1,211 @@
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from b import Fact, SmartInvestor
+
+####### Benchmark do banco de conhecimentos ########
+# Gera bases de regras sintéticas com semente fixa e compara o motor por contadores do
+# SmartInvestor com o laço original (todas as regras a cada passada até não mudar nada):
+#   python kb_benchmark.py --rules 100000
+# Também mede consultas com encadeamento para trás (ask(..., backward=True)) sem inferir o fecho
+# e a chegada de fatos com regras com variáveis (add_pattern_rule).
+
+
+def synthetic_rule_base(n_rules: int, n_base: int = 1_000, max_premises: int = 3, seed: int = 0
+                        ) -> Tuple[List[Fact], List[Tuple[List[Fact], Fact]]]:
+    """ Indicadores ('indicador_i', 'alto') e regras em camadas: as premissas de cada regra
+    vêm dos indicadores ou das conclusões de regras anteriores, então as inferências formam
+    cadeias longas. Só 98% dos indicadores viram fatos, para parte das regras nunca disparar.
+    As regras são embaralhadas para o laço original precisar de várias passadas.
+    Retorna (fatos base, regras)."""
+    rng = random.Random(seed)
+    symbols: List[Fact] = [(f'indicador_{i}', 'alto') for i in range(n_base)]
+    base = [fact for fact in symbols if rng.random() < 0.98]
+    rules = []
+    for i in range(n_rules):
+        # Metade das premissas vem das conclusões mais recentes, para as cadeias ficarem fundas
+        premises = [symbols[rng.randrange(max(0, len(symbols) - 50), len(symbols))]
+                    if rng.random() < 0.5 else symbols[rng.randrange(len(symbols))]
+                    for _ in range(rng.randint(1, max_premises))]
+        conclusion = f'conclusao_{i}'
+        rules.append((premises, conclusion))
+        symbols.append(conclusion)
+    rng.shuffle(rules)
+    return base, rules
+
+
+def naive_infer(facts: set, rules: List[Tuple[List[Fact], Fact]]) -> int:
+    """ O SmartInvestor.infer original: repete passadas sobre todas as regras até nenhuma
+    conclusão nova aparecer. Retorna o número de passadas."""
+    passes = 0
+    new_inferences = True
+    while new_inferences:
+        passes += 1
+        new_inferences = False
+        for premise, conclusion in rules:
+            if all(fact in facts for fact in premise):
+                if conclusion not in facts:
+                    facts.add(conclusion)
+                    new_inferences = True
+    return passes
+
+
+def benchmark_inference(n_rules: int = 100_000, naive: bool = True, seed: int = 0) -> dict:
+    """ Tempo para carregar as regras e inferir o fecho, motor por contadores x laço original,
+    e o custo de um fato novo depois da base já inferida (só o motor incremental)."""
+    base, rules = synthetic_rule_base(n_rules, seed=seed)
+    result = {"rules": n_rules}
+
+    start = time.perf_counter()
+    kb = SmartInvestor()
+    for fact in base:
+        kb.add_fact(fact)
+    for premise, conclusion in rules:
+        kb.add_rule(premise, conclusion)
+    result["load_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    kb.infer()
+    result["infer_seconds"] = time.perf_counter() - start
+    result["facts"] = len(kb.facts)
+    closure = set(kb.facts)
+
+    # Fato novo sem nenhuma regra: ask só processa a agenda (vazia), sem refazer o fecho
+    start = time.perf_counter()
+    kb.add_fact(('indicador_novo', 'alto'))
+    kb.ask('conclusao_0')
+    result["incremental_ask_seconds"] = time.perf_counter() - start
+    kb.remove_fact(('indicador_novo', 'alto'))
+
+    # Retirar um fato base e afirmá-lo de novo: só as consequências dele são revistas
+    removals = []
+    for fact in base[:100]:
+        start = time.perf_counter()
+        kb.remove_fact(fact)
+        middle = time.perf_counter()
+        kb.add_fact(fact)
+        kb.infer()
+        removals.append((middle - start, time.perf_counter() - middle))
+    assert kb.facts == closure, "retirar e afirmar de novo mudou o fecho"
+    result["retract_seconds"] = sum(r for r, _ in removals) / len(removals)
+    result["reassert_seconds"] = sum(a for _, a in removals) / len(removals)
+
+    # Remover regras pelo id e devolvê-las em lote (a remoção antiga varria a lista de regras)
+    some_rules = rules[:1_000]
+    ids = [kb.rule_id(premise, conclusion) for premise, conclusion in some_rules]
+    start = time.perf_counter()
+    kb.remove_rules(ids)
+    result["remove_rules_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    kb.add_rules(some_rules)
+    kb.infer()
+    result["add_rules_seconds"] = time.perf_counter() - start
+    assert kb.facts == closure, "remover e devolver regras mudou o fecho"
+
+    print(f"{n_rules} regras: carga {result['load_seconds']:.3f}s, inferência {result['infer_seconds']:.3f}s, "
+          f"{result['facts']} fatos; ask após fato novo {1e3 * result['incremental_ask_seconds']:.3f} ms")
+    print(f"retirar um fato base {1e3 * result['retract_seconds']:.3f} ms, "
+          f"afirmar de novo {1e3 * result['reassert_seconds']:.3f} ms (média de {len(removals)})")
+    print(f"remover {len(some_rules)} regras {1e3 * result['remove_rules_seconds']:.3f} ms, "
+          f"devolvê-las em lote {1e3 * result['add_rules_seconds']:.3f} ms")
+    if naive:
+        facts = set(base)
+        start = time.perf_counter()
+        passes = naive_infer(facts, rules)
+        result["naive_seconds"] = time.perf_counter() - start
+        result["naive_passes"] = passes
+        assert facts == closure, "o motor por contadores divergiu do laço original"
+        # O ask original refaz a inferência: mesmo com o fecho pronto, custa uma passada inteira
+        start = time.perf_counter()
+        naive_infer(facts, rules)
+        result["naive_ask_seconds"] = time.perf_counter() - start
+        print(f"laço original: {result['naive_seconds']:.3f}s em {passes} passadas (mesmo fecho); "
+              f"ask com o fecho pronto {1e3 * result['naive_ask_seconds']:.1f} ms")
+    return result
+
+
+def benchmark_backward(n_rules: int = 100_000, queries: int = 1_000, seed: int = 0) -> dict:
+    """ Consultas dirigidas ao objetivo em uma base recém-carregada, sem inferir o fecho:
+    a primeira consulta (fria) e a média das seguintes, que reaproveitam os subobjetivos
+    já provados ou refutados. As respostas são conferidas com o fecho do motor para frente."""
+    base, rules = synthetic_rule_base(n_rules, seed=seed)
+    kb = SmartInvestor()
+    for fact in base:
+        kb.add_fact(fact)
+    for premise, conclusion in rules:
+        kb.add_rule(premise, conclusion)
+    reference = SmartInvestor()
+    for fact in base:
+        reference.add_fact(fact)
+    for premise, conclusion in rules:
+        reference.add_rule(premise, conclusion)
+    reference.infer()
+
+    rng = random.Random(seed)
+    goals = [f'conclusao_{rng.randrange(n_rules)}' for _ in range(queries)]
+    times = []
+    for goal in goals:
+        start = time.perf_counter()
+        answer = kb.ask(goal, backward=True)
+        times.append(time.perf_counter() - start)
+        assert answer == (goal in reference.facts), "o encadeamento para trás divergiu do fecho"
+    result = {"rules": n_rules, "queries": queries, "first_seconds": times[0],
+              "mean_seconds": sum(times[1:]) / max(1, len(times) - 1),
+              "total_seconds": sum(times), "derived": len(kb.facts) - len(base),
+              "closure_derived": len(reference.facts) - len(base)}
+    print(f"para trás: {queries} consultas em {result['total_seconds']:.3f}s (primeira "
+          f"{1e3 * result['first_seconds']:.3f} ms, média {1e3 * result['mean_seconds']:.3f} ms); "
+          f"provou {result['derived']} de {result['closure_derived']} fatos derivados do fecho")
+    return result
+
+
+def benchmark_patterns(n_facts: int = 100_000, n_patterns: int = 1_000) -> dict:
+    """ Regras com variáveis: n_patterns regras [('indicador_j', '?nivel')] -> ('sinal_j', '?nivel')
+    e n_facts fatos chegando um a um. Cada fato só é comparado com as premissas indexadas
+    pelas constantes dele, então o custo por fato não cresce com o número de regras.
+    Compara com as mesmas regras escritas à mão, uma por combinação (indicador, nível)."""
+    levels = ['alto', 'medio', 'baixo']
+    facts = [(f'indicador_{i % n_patterns}', levels[i // n_patterns % 3], i) for i in range(n_facts)]
+    result = {"facts": n_facts, "patterns": n_patterns}
+
+    kb = SmartInvestor()
+    for j in range(n_patterns):
+        kb.add_pattern_rule([(f'indicador_{j}', '?nivel', '?serie')], (f'sinal_{j}', '?nivel'))
+    start = time.perf_counter()
+    for fact in facts:
+        kb.add_fact(fact)
+    kb.infer()
+    result["pattern_seconds"] = time.perf_counter() - start
+    result["instances"] = len(kb.rules)
+
+    ground = SmartInvestor()
+    ground.add_rules(([fact], (fact[0].replace('indicador', 'sinal'), fact[1])) for fact in facts)
+    start = time.perf_counter()
+    for fact in facts:
+        ground.add_fact(fact)
+    ground.infer()
+    result["ground_seconds"] = time.perf_counter() - start
+    assert kb.facts == ground.facts, "as regras com variáveis divergiram das regras ground"
+    print(f"variáveis: {n_patterns} regras, {n_facts} fatos em {result['pattern_seconds']:.3f}s "
+          f"({1e6 * result['pattern_seconds'] / n_facts:.1f} µs/fato, {result['instances']} instâncias); "
+          f"{len(ground.rules)} regras ground escritas à mão: {result['ground_seconds']:.3f}s")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do banco de conhecimentos SmartInvestor")
+    parser.add_argument('--rules', type=int, default=100_000, help="número de regras sintéticas")
+    parser.add_argument('--no-naive', action='store_true', help="não roda o laço original")
+    parser.add_argument('--queries', type=int, default=1_000,
+                        help="consultas do encadeamento para trás (0 desliga)")
+    args = parser.parse_args(argv)
+    benchmark_inference(args.rules, naive=not args.no_naive)
+    if args.queries > 0:
+        benchmark_backward(args.rules, args.queries)
+    benchmark_patterns()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,258 @@
+import argparse
+import csv
+import gc
+import json
+import marshal
+import os
+import sys
+import tempfile
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from b import Fact, Rule, SmartInvestor
+
+####### Carga de fatos e regras a partir de arquivos e snapshots compilados ########
+# Formatos de entrada:
+#   - CSV de fatos: uma linha "nome,valor" vira o fato ('nome', 'valor'); uma coluna só vira
+#     o fato 'nome'. Uma linha de cabeçalho "nome,valor" é ignorada.
+#   - JSON de regras: [{"premissas": [["selic", "alta"]], "conclusao": "investimento_tesouro_direto"}]
+#   - DSL de regras e fatos, uma declaração por linha ('#' começa um comentário):
+#         selic=alta                                  (fato ('selic', 'alta'))
+#         selic=alta & inflacao=alta -> tesouro_ipca  (regra)
+# Snapshot compilado: a base já inferida gravada com marshal (ver save_snapshot), para um
+# serviço subir sem repetir as chamadas a add_fact/add_rule nem a inferência.
+
+SNAPSHOT_VERSION = 2   # 2: regras com variáveis; a versão 1 (sem elas) ainda é lida
+
+
+def _term(token: str) -> Fact:
+    """ 'selic=alta' vira ('selic', 'alta'); um nome sozinho fica como texto."""
+    token = token.strip()
+    if '=' in token:
+        name, value = token.split('=', 1)
+        return name.strip(), value.strip()
+    return token
+
+
+def _fact_from_json(value) -> Fact:
+    """ Listas do JSON viram tuplas (fatos precisam ser hashable)."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def load_facts_csv(kb: SmartInvestor, path: str) -> int:
+    """ Afirma os fatos de um CSV "nome,valor" (ver o topo do módulo). Retorna quantos leu."""
+    count = 0
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#') or row == ['nome', 'valor']:
+                continue
+            kb.add_fact((row[0], row[1]) if len(row) > 1 else row[0])
+            count += 1
+    return count
+
+
+def load_rules_json(kb: SmartInvestor, path: str) -> List[int]:
+    """ Adiciona em lote as regras de um JSON (ver o topo do módulo). Retorna os ids."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rules = [([_fact_from_json(p) for p in entry['premissas']], _fact_from_json(entry['conclusao']))
+             for entry in data]
+    return kb.add_rules(rules)
+
+
+def parse_dsl(text: str) -> Tuple[List[Fact], List[Rule]]:
+    """ Lê a DSL de regras (ver o topo do módulo). Retorna (fatos, regras)."""
+    facts: List[Fact] = []
+    rules: List[Rule] = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if '->' in line:
+            premises, conclusion = line.split('->', 1)
+            terms = [_term(t) for t in premises.split('&')]
+            if not all(terms) or not conclusion.strip():
+                raise ValueError(f"Regra mal formada na linha {number}: {line}")
+            rules.append((terms, _term(conclusion)))
+        else:
+            facts.append(_term(line))
+    return facts, rules
+
+
+def load_dsl(kb: SmartInvestor, path: str) -> Tuple[int, List[int]]:
+    """ Afirma os fatos e adiciona em lote as regras de um arquivo na DSL.
+    Retorna (fatos lidos, ids das regras)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        facts, rules = parse_dsl(f.read())
+    for fact in facts:
+        kb.add_fact(fact)
+    return len(facts), kb.add_rules(rules)
+
+
+def save_snapshot(kb: SmartInvestor, path: str) -> None:
+    """ Grava a base inferida como snapshot compilado:
+    - símbolos internados: cada fato distinto (de fatos e regras) aparece uma vez, e o resto
+      do arquivo usa o índice dele
+    - regras em arrays estilo CSR: id, conclusão, início das premissas e premissas
+    - o fecho (fatos verdadeiros) e os fatos afirmados: os símbolos começam pelos afirmados,
+      seguidos dos derivados, então bastam os dois tamanhos
+    - regras com variáveis: (id, premissas, conclusão, ids das instâncias); as instâncias
+      já estão entre as regras acima
+    O arquivo é um dict serializado com marshal (rápido, mas só vale para a mesma versão
+    do Python)."""
+    kb.infer()
+    symbols: List[Fact] = []
+    index: Dict[Fact, int] = {}
+
+    def intern(fact: Fact) -> int:
+        i = index.get(fact)
+        if i is None:
+            i = index[fact] = len(symbols)
+            symbols.append(fact)
+        return i
+
+    # Afirmados primeiro, depois os derivados do fecho: na carga, os dois conjuntos são só
+    # fatias do início da tabela de símbolos
+    for fact in kb._asserted:
+        intern(fact)
+    for fact in kb.facts:
+        intern(fact)
+    ids, conclusions, starts, premises = array('q'), array('q'), array('q'), array('q')
+    for rule, (premise, conclusion) in kb._rules.items():
+        ids.append(rule)
+        conclusions.append(intern(conclusion))
+        starts.append(len(premises))
+        premises.extend(intern(fact) for fact in premise)
+    starts.append(len(premises))
+    patterns = [(pattern, list(premise), conclusion, kb.pattern_instances(pattern))
+                for pattern, (premise, conclusion) in kb._patterns.items()]
+    data = {'versao': SNAPSHOT_VERSION, 'simbolos': symbols, 'fecho': len(kb.facts),
+            'afirmados': len(kb._asserted), 'regras': ids.tobytes(), 'conclusoes': conclusions.tobytes(),
+            'inicio': starts.tobytes(), 'premissas': premises.tobytes(), 'proxima_regra': kb._next_rule,
+            'padroes': patterns}
+    with open(path, 'wb') as f:
+        marshal.dump(data, f)
+
+
+def _array(data: bytes) -> array:
+    values = array('q')
+    values.frombytes(data)
+    return values
+
+
+def load_snapshot(path: str) -> SmartInvestor:
+    """ Reconstrói um SmartInvestor a partir de save_snapshot, sem inferir nada: o fecho vem
+    pronto e as contagens de premissas faltantes são recalculadas a partir dele."""
+    # A carga cria milhões de objetos e nenhum ciclo: o coletor de ciclos só atrasaria
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, 'rb') as f:
+            data = marshal.load(f)
+        if data.get('versao') not in (1, SNAPSHOT_VERSION):
+            raise ValueError(f"Versão de snapshot não suportada: {data.get('versao')}")
+        symbols = data['simbolos']
+        n_true = data['fecho']   # símbolos 0..n_true-1 são fatos verdadeiros
+
+        kb = SmartInvestor()
+        kb.facts = set(symbols[:n_true])
+        kb._asserted = set(symbols[:data['afirmados']])
+        starts, premises = _array(data['inicio']), _array(data['premissas'])
+        by_premise, by_conclusion = kb._by_premise, kb._by_conclusion
+        for k, (rule, conclusion) in enumerate(zip(_array(data['regras']), _array(data['conclusoes']))):
+            premise_ids = premises[starts[k]:starts[k + 1]]
+            premise = [symbols[i] for i in premise_ids]
+            fact = symbols[conclusion]
+            distinct = frozenset(premise)
+            kb._rules[rule] = (premise, fact)
+            kb._signatures[(distinct, fact)] = rule
+            kb._missing[rule] = sum(1 for i in set(premise_ids) if i >= n_true)
+            for p in distinct:
+                by_premise.setdefault(p, set()).add(rule)
+            by_conclusion.setdefault(fact, set()).add(rule)
+        # Regras com variáveis: os índices são refeitos, as instâncias vêm do arquivo
+        for pattern, premise, conclusion, instances in data.get('padroes', ()):
+            kb._register_pattern(pattern, premise, conclusion)
+            kb._instances[pattern].update(instances)
+            for rule in instances:
+                kb._owners[rule] = kb._owners.get(rule, 0) + 1
+    finally:
+        if enabled:
+            gc.enable()
+    kb._next_rule = data['proxima_regra']
+    return kb
+
+
+def benchmark_snapshot(n_facts: int = 1_000_000, n_rules: int = 100_000) -> dict:
+    """ Base sintética com n_facts fatos e n_rules regras (kb_benchmark.synthetic_rule_base):
+    compara subir a base lendo um CSV e repetindo a inferência com carregar o snapshot."""
+    from kb_benchmark import synthetic_rule_base
+    _, rules = synthetic_rule_base(n_rules, n_base=n_facts, seed=0)
+    result = {"facts": n_facts, "rules": n_rules}
+    with tempfile.TemporaryDirectory() as tmp:
+        facts_path = os.path.join(tmp, 'fatos.csv')
+        rules_path = os.path.join(tmp, 'regras.json')
+        snapshot_path = os.path.join(tmp, 'base.snapshot')
+        with open(facts_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['nome', 'valor'])
+            writer.writerows(f'indicador_{i},alto'.split(',') for i in range(n_facts))
+        with open(rules_path, 'w', encoding='utf-8') as f:
+            json.dump([{"premissas": premise, "conclusao": conclusion} for premise, conclusion in rules], f)
+
+        start = time.perf_counter()
+        kb = SmartInvestor()
+        load_facts_csv(kb, facts_path)
+        load_rules_json(kb, rules_path)
+        kb.infer()
+        result["replay_seconds"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_snapshot(kb, snapshot_path)
+        result["save_seconds"] = time.perf_counter() - start
+        result["snapshot_bytes"] = os.path.getsize(snapshot_path)
+
+        start = time.perf_counter()
+        loaded = load_snapshot(snapshot_path)
+        result["load_seconds"] = time.perf_counter() - start
+        assert loaded.facts == kb.facts and loaded.rules == kb.rules, "o snapshot divergiu da base original"
+        result["closure"] = len(loaded.facts)
+
+    print(f"{n_facts} fatos, {n_rules} regras ({result['closure']} no fecho): CSV+JSON+inferência "
+          f"{result['replay_seconds']:.2f}s; snapshot gravado em {result['save_seconds']:.2f}s "
+          f"({result['snapshot_bytes'] / 2**20:.1f} MiB), carregado em {result['load_seconds']:.2f}s")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    # Uso: python kb_io.py regras.dsl [--save base.snapshot] [--ask fato ...]
+    #      python kb_io.py --load base.snapshot --ask investimento_bitcoin
+    #      python kb_io.py --benchmark 1000000
+    parser = argparse.ArgumentParser(description="Carga de bases de conhecimento e snapshots compilados")
+    parser.add_argument('sources', nargs='*', help="arquivos .dsl, .csv (fatos) ou .json (regras)")
+    parser.add_argument('--load', help="snapshot a carregar antes das fontes")
+    parser.add_argument('--save', help="grava o snapshot compilado da base resultante")
+    parser.add_argument('--ask', nargs='*', default=[], help="consultas (nome=valor ou nome)")
+    parser.add_argument('--benchmark', type=int, metavar='FATOS', help="mede CSV+inferência x snapshot")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        benchmark_snapshot(args.benchmark)
+        return
+    kb = load_snapshot(args.load) if args.load else SmartInvestor()
+    for path in args.sources:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            load_facts_csv(kb, path)
+        elif extension == '.json':
+            load_rules_json(kb, path)
+        else:
+            load_dsl(kb, path)
+    if args.save:
+        save_snapshot(kb, args.save)
+    for query in args.ask:
+        print(f"{query}? {kb.ask(_term(query))}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,225 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from b import Fact, SmartInvestor
+
+####### Consultas concorrentes sobre snapshots imutáveis da base ########
+# O SmartInvestor muda self.facts dentro de infer (e ask chama infer), então não pode ser
+# consultado por várias threads ao mesmo tempo. O KnowledgeServer separa os dois lados:
+#   - escritores: trava única; alteram a base, inferem e publicam um KnowledgeSnapshot novo
+#     (fecho congelado em frozenset) trocando uma única referência, o que é atômico
+#   - leitores: pegam a referência atual e consultam o frozenset, sem trava e sem inferir
+# Uma thread que precisa de várias respostas consistentes entre si usa server.snapshot().
+#   python kb_server.py --threads 8 --seconds 2
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    facts: FrozenSet[Fact]   # fecho: fatos afirmados e derivados
+    version: int             # aumenta a cada publicação
+
+    def ask(self, query: Fact) -> bool:
+        return query in self.facts
+
+
+class KnowledgeServer:
+    """ Base compartilhada entre threads: escreve no SmartInvestor sob trava e publica
+    snapshots imutáveis para as leituras (ver o topo do módulo)."""
+
+    def __init__(self, kb: Optional[SmartInvestor] = None):
+        self._kb = kb if kb is not None else SmartInvestor()
+        self._lock = threading.Lock()
+        self._batching = False
+        self._snapshot = self._freeze(0)
+
+    def _freeze(self, version: int) -> KnowledgeSnapshot:
+        self._kb.infer()
+        return KnowledgeSnapshot(frozenset(self._kb.facts), version)
+
+    def _publish(self) -> None:
+        # Chamado com a trava; a atribuição é a única coisa que os leitores observam
+        if not self._batching:
+            self._snapshot = self._freeze(self._snapshot.version + 1)
+
+    def snapshot(self) -> KnowledgeSnapshot:
+        return self._snapshot
+
+    def ask(self, query: Fact) -> bool:
+        # Leitura sem trava: a referência lida é sempre um snapshot completo
+        return query in self._snapshot.facts
+
+    @contextmanager
+    def batch(self) -> Iterator[SmartInvestor]:
+        """ Várias alterações com uma publicação só no fim (o frozenset custa O(fatos)):
+            with server.batch() as kb:
+                kb.add_fact(...); kb.add_rule(...)"""
+        with self._lock:
+            self._batching = True
+            try:
+                yield self._kb
+            finally:
+                self._batching = False
+                self._publish()
+
+    def add_fact(self, fact: Fact) -> None:
+        with self._lock:
+            self._kb.add_fact(fact)
+            self._publish()
+
+    def remove_fact(self, fact: Fact) -> None:
+        with self._lock:
+            self._kb.remove_fact(fact)
+            self._publish()
+
+    def add_rule(self, premise: List[Fact], conclusion: Fact) -> int:
+        with self._lock:
+            rule = self._kb.add_rule(premise, conclusion)
+            self._publish()
+            return rule
+
+    def remove_rule(self, premise: List[Fact], conclusion: Fact) -> None:
+        with self._lock:
+            self._kb.remove_rule(premise, conclusion)
+            self._publish()
+
+    def add_pattern_rule(self, premise: List[Fact], conclusion: Fact) -> int:
+        with self._lock:
+            pattern = self._kb.add_pattern_rule(premise, conclusion)
+            self._publish()
+            return pattern
+
+
+Request = Tuple[str, Fact]   # ('ask' | 'add_fact' | 'remove_fact', fato)
+
+
+def drive_requests(server: KnowledgeServer, requests: Sequence[Request], workers: int = 8
+                   ) -> Tuple[List[Optional[bool]], dict]:
+    """ Substituto local do serviço: despacha as requisições para um pool de threads, como
+    chegariam de vários clientes. Retorna (resposta de cada requisição, None para escritas;
+    estatísticas de vazão e latência)."""
+    handlers = {'ask': server.ask, 'add_fact': server.add_fact, 'remove_fact': server.remove_fact}
+
+    def handle(request: Request) -> Tuple[Optional[bool], float]:
+        start = time.perf_counter()
+        answer = handlers[request[0]](request[1])
+        return answer, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(handle, requests, chunksize=256))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for _, latency in results)
+    stats = {"requests": len(requests), "seconds": elapsed, "per_second": len(requests) / elapsed,
+             "p50_us": 1e6 * latencies[len(latencies) // 2],
+             "p99_us": 1e6 * latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]}
+    return [answer for answer, _ in results], stats
+
+
+def _throughput(ask, threads: int, seconds: float, queries: Sequence[Fact], writer=None) -> int:
+    """ Consultas respondidas por `threads` leitores em `seconds`, com um escritor opcional
+    alterando a base o tempo todo."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(i: int) -> None:
+        rng = random.Random(i)
+        n = 0
+        while not stop.is_set():
+            for _ in range(1_000):
+                ask(queries[rng.randrange(len(queries))])
+            n += 1_000
+        counts[i] = n
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    if writer is not None:
+        workers.append(threading.Thread(target=writer, args=(stop,)))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts)
+
+
+def benchmark_concurrency(threads: int = 8, seconds: float = 2.0, n_rules: int = 10_000) -> dict:
+    """ Vazão de consultas com `threads` leitores e um escritor que retira e afirma fatos base:
+    snapshot sem trava x SmartInvestor compartilhado com uma trava em volta de cada ask
+    (o jeito mínimo de usá-lo com threads). No CPython as threads dividem o GIL, então o
+    ganho vem de a leitura não inferir nem disputar a trava com o escritor, não de paralelismo."""
+    from kb_benchmark import synthetic_rule_base
+    base, rules = synthetic_rule_base(n_rules)
+    queries = [conclusion for _, conclusion in rules]
+    result = {"threads": threads, "rules": n_rules}
+
+    def loaded() -> SmartInvestor:
+        kb = SmartInvestor()
+        for fact in base:
+            kb.add_fact(fact)
+        kb.add_rules(rules)
+        kb.infer()
+        return kb
+
+    server = KnowledgeServer(loaded())
+
+    def snapshot_writer(stop: threading.Event) -> None:
+        rng = random.Random(0)
+        while not stop.is_set():
+            fact = base[rng.randrange(len(base))]
+            server.remove_fact(fact)
+            server.add_fact(fact)
+
+    answered = _throughput(server.ask, threads, seconds, queries, snapshot_writer)
+    result["snapshot_per_second"] = answered / seconds
+    result["snapshot_versions"] = server.snapshot().version
+
+    shared = loaded()
+    lock = threading.Lock()
+
+    def locked_ask(query: Fact) -> bool:
+        with lock:
+            return shared.ask(query)
+
+    def locked_writer(stop: threading.Event) -> None:
+        rng = random.Random(0)
+        while not stop.is_set():
+            fact = base[rng.randrange(len(base))]
+            with lock:
+                shared.remove_fact(fact)
+                shared.add_fact(fact)
+
+    answered = _throughput(locked_ask, threads, seconds, queries, locked_writer)
+    result["locked_per_second"] = answered / seconds
+
+    requests = [('ask', queries[i % len(queries)]) if i % 100 else ('add_fact', ('indicador_extra', str(i)))
+                for i in range(200_000)]
+    _, result["driver"] = drive_requests(server, requests, workers=threads)
+
+    driver = result["driver"]
+    print(f"{threads} leitores + 1 escritor, {n_rules} regras, {seconds:.1f}s:")
+    print(f"  snapshot sem trava: {result['snapshot_per_second']:,.0f} consultas/s "
+          f"({result['snapshot_versions']} versões publicadas)")
+    print(f"  SmartInvestor com trava: {result['locked_per_second']:,.0f} consultas/s")
+    print(f"  driver local: {driver['requests']} requisições (1% escritas) a {driver['per_second']:,.0f}/s, "
+          f"p50 {driver['p50_us']:.1f} µs, p99 {driver['p99_us']:.1f} µs")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Vazão de consultas concorrentes ao SmartInvestor")
+    parser.add_argument('--threads', type=int, default=8, help="threads leitoras")
+    parser.add_argument('--seconds', type=float, default=2.0, help="duração de cada medição")
+    parser.add_argument('--rules', type=int, default=10_000, help="número de regras sintéticas")
+    args = parser.parse_args(argv)
+    benchmark_concurrency(args.threads, args.seconds, args.rules)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,180 @@
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import bayesian
+
+####### Pontuação em lote de registros de pacientes ########
+# Lê os registros em blocos (CSV ou Parquet), agrupa os padrões de evidência idênticos e
+# calcula P(influenza) e P(tuberculose) uma vez por padrão distinto; o resultado é escrito
+# bloco a bloco, então a memória não cresce com o tamanho do arquivo.
+# Cada coluna de sintoma vale 0, 1 ou vazio (não observado); as demais colunas (ex.: id do
+# paciente) são copiadas para a saída, seguidas de p_influenza e p_tuberculose.
+#   python bayes_batch.py pacientes.csv resultado.csv
+#   python bayes_batch.py --generate 2000000 pacientes.csv   (arquivo sintético)
+# Parquet precisa do pyarrow, importado só quando um arquivo .parquet é usado.
+
+SINTOMAS = ['tosse', 'febre', 'mialgia', 'congestao_nasal', 'perda_peso', 'sudorese_noturna',
+            'raiox_alterado']
+COLUNAS_SAIDA = ['p_influenza', 'p_tuberculose']
+
+
+def _is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Arquivos Parquet precisam do pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def read_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """ Blocos de até chunksize registros, de um CSV ou de um Parquet."""
+    if _is_parquet(path):
+        parquet_file = _pyarrow().parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        # Int8 anulável: sintoma vazio não transforma a coluna em float na saída
+        yield from pd.read_csv(path, chunksize=chunksize, dtype={s: 'Int8' for s in SINTOMAS})
+
+
+def pattern_codes(chunk: pd.DataFrame, sintomas: List[str]) -> np.ndarray:
+    """ Codifica a evidência de cada registro como um inteiro em base 3 (um dígito por
+    sintoma: 0 = não observado, 1 = ausente, 2 = presente)."""
+    codes = np.zeros(len(chunk), dtype=np.int64)
+    for sintoma in sintomas:
+        values = chunk[sintoma].to_numpy(dtype=float, na_value=np.nan)
+        observed = ~np.isnan(values)
+        if not np.isin(values[observed], (0, 1)).all():
+            raise ValueError(f"Coluna {sintoma} deve ter só 0, 1 ou vazio")
+        codes = codes * 3 + np.where(observed, values + 1, 0).astype(np.int64)
+    return codes
+
+
+def decode_pattern(code: int, sintomas: List[str]) -> Dict[str, int]:
+    """ Inverso de pattern_codes para um registro: a evidência como dict."""
+    evidence = {}
+    for sintoma in reversed(sintomas):
+        code, digit = divmod(code, 3)
+        if digit:
+            evidence[sintoma] = digit - 1
+    return evidence
+
+
+class _Writer:
+    """ Escreve os blocos de saída em CSV (anexando) ou Parquet (um row group por bloco)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._file = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.parquet:
+            pyarrow = _pyarrow()
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            header = self._file is None
+            if header:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            frame.to_csv(self._file, header=header, index=False)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _peak_memory_mib() -> Optional[float]:
+    """ Pico de memória residente do processo (None onde o módulo resource não existe)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10   # bytes no macOS, KiB no Linux
+
+
+def score_file(input_path: str, output_path: str, chunksize: int = 100_000) -> dict:
+    """ Pontua todos os registros de input_path e escreve em output_path (ver o topo do módulo).
+    Cada padrão distinto é consultado uma vez no arquivo inteiro (bayesian.posterior).
+    Retorna estatísticas: registros, padrões, tempo, registros/s e pico de memória."""
+    start = time.perf_counter()
+    known: Dict[int, Tuple[float, float]] = {}   # código do padrão -> (P(influenza), P(tuberculose))
+    records = 0
+    writer = _Writer(output_path)
+    try:
+        for chunk in read_chunks(input_path, chunksize):
+            sintomas = [s for s in SINTOMAS if s in chunk.columns]
+            codes, inverse = np.unique(pattern_codes(chunk, sintomas), return_inverse=True)
+            for code in codes.tolist():
+                if code not in known:
+                    p = bayesian.posterior(decode_pattern(code, sintomas))
+                    known[code] = (p['influenza'], p['tuberculose'])
+            table = np.array([known[code] for code in codes.tolist()]).reshape(-1, 2)
+            scores = table[inverse.reshape(-1)]
+            chunk[COLUNAS_SAIDA[0]] = scores[:, 0]
+            chunk[COLUNAS_SAIDA[1]] = scores[:, 1]
+            writer.write(chunk)
+            records += len(chunk)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {"records": records, "patterns": len(known), "seconds": elapsed,
+            "per_second": records / elapsed if elapsed > 0 else float('inf'),
+            "peak_mib": _peak_memory_mib()}
+
+
+def generate_patients(path: str, n: int, seed: int = 0, chunksize: int = 500_000) -> None:
+    """ Arquivo sintético com n pacientes: cada sintoma é observado com 60% de chance e,
+    quando observado, presente com 30%."""
+    rng = np.random.default_rng(seed)
+    writer = _Writer(path)
+    try:
+        for offset in range(0, n, chunksize):
+            size = min(chunksize, n - offset)
+            frame = pd.DataFrame({'paciente': np.arange(offset, offset + size)})
+            for sintoma in SINTOMAS:
+                values = (rng.random(size) < 0.3).astype(float)
+                values[rng.random(size) >= 0.6] = np.nan
+                frame[sintoma] = pd.array(values, dtype='Int8')
+            writer.write(frame)
+    finally:
+        writer.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pontuação em lote de pacientes na rede bayesiana")
+    parser.add_argument('input', help="CSV/Parquet de entrada (ou de saída, com --generate)")
+    parser.add_argument('output', nargs='?', help="CSV/Parquet com p_influenza e p_tuberculose")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="registros por bloco")
+    parser.add_argument('--generate', type=int, metavar='N', help="gera um arquivo sintético com N pacientes")
+    args = parser.parse_args(argv)
+    if args.generate:
+        generate_patients(args.input, args.generate)
+        return
+    if not args.output:
+        parser.error("informe o arquivo de saída")
+    stats = score_file(args.input, args.output, args.chunksize)
+    peak = f", pico de memória {stats['peak_mib']:.0f} MiB" if stats['peak_mib'] is not None else ""
+    print(f"{stats['records']} registros, {stats['patterns']} padrões distintos, {stats['seconds']:.2f}s "
+          f"({stats['per_second']:,.0f} registros/s{peak})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
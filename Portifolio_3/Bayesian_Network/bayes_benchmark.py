@@ -0,0 +1,76 @@
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import bayesian
+
+####### Benchmark das consultas da rede bayesiana de diagnóstico ########
+# Fluxo de triagem sintético: cada paciente informa um subconjunto dos sintomas, e poucos
+# padrões concentram a maior parte dos atendimentos (frequência tipo Zipf).
+#   python bayes_benchmark.py --patients 20000
+
+SINTOMAS = ['tosse', 'febre', 'mialgia', 'congestao_nasal', 'perda_peso', 'sudorese_noturna',
+            'raiox_alterado']
+
+
+def triage_stream(n_patients: int, n_patterns: int = 200, seed: int = 0) -> List[Dict[str, int]]:
+    """ n_patients evidências sorteadas de n_patterns padrões; o padrão de posição i tem
+    peso 1/(i+1). Cada padrão observa de 1 a 5 sintomas, cada um presente ou ausente."""
+    rng = random.Random(seed)
+    patterns = []
+    for _ in range(n_patterns):
+        observed = rng.sample(SINTOMAS, rng.randint(1, 5))
+        patterns.append({s: int(rng.random() < 0.6) for s in observed})
+    weights = [1 / (i + 1) for i in range(n_patterns)]
+    return [dict(p) for p in rng.choices(patterns, weights=weights, k=n_patients)]
+
+
+def legacy_posterior(evid_dict: Dict[str, int]) -> Dict[str, float]:
+    """ O consulta_posterior original sem o print: uma eliminação por doença, sem cache."""
+    q_inf = bayesian.infer.query(['influenza'], evidence=evid_dict, show_progress=False)
+    q_tb = bayesian.infer.query(['tuberculose'], evidence=evid_dict, show_progress=False)
+    return {'influenza': float(q_inf.values[1]), 'tuberculose': float(q_tb.values[1])}
+
+
+def benchmark_queries(n_patients: int = 20_000, n_patterns: int = 200) -> dict:
+    """ Consultas por segundo no fluxo de triagem: original x conjunta única com cache LRU.
+    As respostas são comparadas paciente a paciente."""
+    stream = triage_stream(n_patients, n_patterns)
+    result = {"patients": n_patients, "patterns": len({frozenset(e.items()) for e in stream})}
+
+    start = time.perf_counter()
+    legacy = [legacy_posterior(e) for e in stream]
+    result["legacy_seconds"] = time.perf_counter() - start
+
+    bayesian.posterior_cache_clear()
+    start = time.perf_counter()
+    cached = [bayesian.posterior(e) for e in stream]
+    result["cached_seconds"] = time.perf_counter() - start
+    info = bayesian.posterior_cache_info()
+    result["hits"], result["misses"] = info.hits, info.misses
+
+    worst = max(abs(a[d] - b[d]) for a, b in zip(legacy, cached) for d in bayesian.DOENCAS)
+    assert worst < 1e-9, f"a conjunta divergiu das consultas separadas ({worst:g})"
+    result["max_error"] = worst
+
+    print(f"{n_patients} pacientes, {result['patterns']} padrões distintos:")
+    print(f"  original (duas eliminações): {result['legacy_seconds']:.2f}s "
+          f"({n_patients / result['legacy_seconds']:,.0f} pacientes/s)")
+    print(f"  conjunta + cache LRU: {result['cached_seconds']:.3f}s "
+          f"({n_patients / result['cached_seconds']:,.0f} pacientes/s; "
+          f"{info.hits} acertos, {info.misses} eliminações); diferença máxima {worst:.1e}")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark das consultas da rede bayesiana")
+    parser.add_argument('--patients', type=int, default=20_000, help="pacientes no fluxo de triagem")
+    parser.add_argument('--patterns', type=int, default=200, help="padrões de sintomas distintos")
+    args = parser.parse_args(argv)
+    benchmark_queries(args.patients, args.patterns)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,262 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from bayes_compiled import DEFAULT_PATH, CompiledNetwork
+
+####### Inferência aproximada por amostragem vetorizada ########
+# Para redes com muitas doenças interligadas, onde a eliminação exata fica cara. As duas
+# formas trabalham sobre o artefato de bayes_compiled (só NumPy) e amostram em lotes: cada
+# linha de uma matriz (amostras x variáveis) é uma amostra, e as CPDs são percorridas em
+# ordem topológica, uma coluna de cada vez.
+#   - likelihood weighting: evidência fixada, peso = produto de P(evidência | pais);
+#     tamanho efetivo da amostra (ESS) = (soma w)^2 / soma w^2
+#   - Gibbs: várias cadeias em paralelo, cada variável livre reamostrada da sua distribuição
+#     dado o cobertor de Markov; ESS pela autocorrelação dos traços
+# Os lotes/cadeias são divididos entre processos (cada um carrega o .npz por conta própria).
+#   python bayes_sampling.py tosse=1 febre=1 --samples 1000000 --workers 4
+
+BATCH = 1 << 16   # amostras por lote no likelihood weighting
+
+
+class Sampler:
+    """ Amostragem sobre uma CompiledNetwork (ver o topo do módulo)."""
+
+    def __init__(self, network: CompiledNetwork):
+        self.network = network
+        self.tables = {scope[0]: (scope[1:], table) for scope, table in network.cpds}
+        self.children: Dict[int, List[int]] = {v: [] for v in self.tables}
+        for v, (parents, _) in self.tables.items():
+            for parent in parents:
+                self.children[parent].append(v)
+        # Ordem topológica: cada variável depois dos seus pais
+        self.order: List[int] = []
+        placed = set()
+        pending = sorted(self.tables)
+        while pending:
+            ready = [v for v in pending if all(p in placed for p in self.tables[v][0])]
+            if not ready:
+                raise ValueError("A rede tem um ciclo")
+            self.order.extend(ready)
+            placed.update(ready)
+            pending = [v for v in pending if v not in placed]
+
+    def _distribution(self, v: int, states: np.ndarray) -> np.ndarray:
+        """ P(v | pais) para cada amostra: matriz (estados de v, amostras)."""
+        parents, table = self.tables[v]
+        if not parents:
+            return np.broadcast_to(table[:, None], (table.shape[0], len(states)))
+        return table[(slice(None),) + tuple(states[:, p] for p in parents)]
+
+    def _value(self, v: int, states: np.ndarray) -> np.ndarray:
+        """ P(v = estado atual | pais) para cada amostra."""
+        parents, table = self.tables[v]
+        return table[(states[:, v],) + tuple(states[:, p] for p in parents)]
+
+    @staticmethod
+    def _draw(probs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # Um estado por coluna, proporcional a probs (as colunas não precisam somar 1)
+        cumulative = probs.cumsum(axis=0)
+        u = rng.random(probs.shape[1]) * cumulative[-1]
+        return np.minimum((cumulative < u).sum(axis=0), probs.shape[0] - 1)
+
+    def _observed(self, evidence: Mapping[str, int]) -> Dict[int, int]:
+        return {self.network.index[name]: int(state) for name, state in evidence.items()}
+
+    def likelihood_weighting(self, evidence: Mapping[str, int], queries: Sequence[str], n: int,
+                             rng: np.random.Generator) -> dict:
+        """ Somas de pesos de n amostras, em lotes de BATCH. Os pesos são acumulados em log
+        com um deslocamento comum (`shift`) para não zerar em redes com muita evidência;
+        merge_weights junta resultados de vários processos."""
+        observed = self._observed(evidence)
+        targets = [self.network.index[q] for q in queries]
+        sums = {"shift": -np.inf, "w": 0.0, "w2": 0.0, "wq": np.zeros(len(targets)), "n": 0}
+        for offset in range(0, n, BATCH):
+            size = min(BATCH, n - offset)
+            states = np.zeros((size, len(self.network.variables)), dtype=np.int64)
+            log_w = np.zeros(size)
+            for v in self.order:
+                if v in observed:
+                    states[:, v] = observed[v]
+                    with np.errstate(divide='ignore'):
+                        log_w += np.log(self._value(v, states))
+                else:
+                    states[:, v] = self._draw(self._distribution(v, states), rng)
+            batch = {"shift": log_w.max(), "n": size}
+            w = np.exp(log_w - batch["shift"])
+            batch["w"], batch["w2"] = w.sum(), (w * w).sum()
+            batch["wq"] = np.array([w[states[:, t] == 1].sum() for t in targets])
+            sums = merge_weights([sums, batch])
+        return sums
+
+    def gibbs(self, evidence: Mapping[str, int], queries: Sequence[str], chains: int, steps: int,
+              burn_in: int, rng: np.random.Generator) -> np.ndarray:
+        """ `chains` cadeias de Gibbs lado a lado (uma linha por cadeia). Começam de uma
+        amostra direta com a evidência fixada; depois de burn_in varreduras, guarda o estado
+        das consultas a cada varredura. Retorna os traços (consultas, cadeias, steps) de
+        indicadores var == 1."""
+        observed = self._observed(evidence)
+        targets = [self.network.index[q] for q in queries]
+        free = [v for v in self.order if v not in observed]
+        states = np.zeros((chains, len(self.network.variables)), dtype=np.int64)
+        for v in self.order:
+            states[:, v] = observed[v] if v in observed else self._draw(self._distribution(v, states), rng)
+        traces = np.zeros((len(targets), chains, steps), dtype=np.int8)
+        for step in range(burn_in + steps):
+            for v in free:
+                card = self.tables[v][1].shape[0]
+                log_p = np.zeros((card, chains))
+                with np.errstate(divide='ignore'):
+                    for s in range(card):
+                        states[:, v] = s
+                        log_p[s] = np.log(self._value(v, states))
+                        for child in self.children[v]:
+                            log_p[s] += np.log(self._value(child, states))
+                log_p -= log_p.max(axis=0)
+                states[:, v] = self._draw(np.exp(log_p), rng)
+            if step >= burn_in:
+                traces[:, :, step - burn_in] = (states[:, targets] == 1).T
+        return traces
+
+
+def merge_weights(parts: Sequence[dict]) -> dict:
+    """ Junta somas de likelihood_weighting levando todas ao maior deslocamento."""
+    shift = max(part["shift"] for part in parts)
+    merged = {"shift": shift, "w": 0.0, "w2": 0.0, "wq": 0.0, "n": 0}
+    for part in parts:
+        if part["n"] == 0 or part["shift"] == -np.inf:
+            merged["n"] += part["n"]
+            continue
+        scale = np.exp(part["shift"] - shift)
+        merged["w"] += part["w"] * scale
+        merged["w2"] += part["w2"] * scale * scale
+        merged["wq"] = merged["wq"] + part["wq"] * scale
+        merged["n"] += part["n"]
+    return merged
+
+
+def effective_sample_size(traces: np.ndarray) -> float:
+    """ ESS de um traço (cadeias, passos): n / (1 + 2 soma das autocorrelações), com a
+    autocorrelação média entre cadeias truncada na primeira soma de pares negativa (Geyer)."""
+    chains, steps = traces.shape
+    centered = traces - traces.mean(axis=1, keepdims=True)
+    spectrum = np.fft.rfft(centered, n=2 * steps, axis=1)
+    autocov = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :steps].mean(axis=0) / steps
+    if autocov[0] <= 0:
+        return float(chains * steps)   # traço constante: nada a corrigir
+    rho = autocov / autocov[0]
+    total = 0.0
+    for t in range(1, steps - 1, 2):
+        pair = rho[t] + rho[t + 1]
+        if pair < 0:
+            break
+        total += pair
+    return float(chains * steps / (1 + 2 * total))
+
+
+def _lw_worker(path: str, evidence: Mapping[str, int], queries: Sequence[str], n: int,
+               seed: np.random.SeedSequence) -> dict:
+    return Sampler(CompiledNetwork(path)).likelihood_weighting(evidence, queries, n, np.random.default_rng(seed))
+
+
+def _gibbs_worker(path: str, evidence: Mapping[str, int], queries: Sequence[str], chains: int, steps: int,
+                  burn_in: int, seed: np.random.SeedSequence) -> np.ndarray:
+    return Sampler(CompiledNetwork(path)).gibbs(evidence, queries, chains, steps, burn_in,
+                                                np.random.default_rng(seed))
+
+
+def _split(total: int, parts: int) -> List[int]:
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
+def _run(worker, jobs: List[tuple], workers: int) -> list:
+    if workers == 1:
+        return [worker(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(worker, *zip(*jobs)))
+
+
+def sample_lw(evidence: Mapping[str, int], queries: Sequence[str], samples: int, workers: int = 1,
+              path: str = DEFAULT_PATH, seed: int = 0) -> dict:
+    """ Likelihood weighting com as amostras divididas entre `workers` processos.
+    Retorna a estimativa de P(consulta=1 | evid) de cada consulta e o ESS."""
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(path, dict(evidence), list(queries), n, s) for n, s in zip(_split(samples, workers), seeds)]
+    sums = merge_weights(_run(_lw_worker, jobs, workers))
+    if sums["w"] == 0:
+        raise ValueError("Nenhuma amostra compatível com a evidência")
+    return {"estimates": dict(zip(queries, (sums["wq"] / sums["w"]).tolist())),
+            "ess": sums["w"] ** 2 / sums["w2"], "samples": samples}
+
+
+def sample_gibbs(evidence: Mapping[str, int], queries: Sequence[str], chains: int, steps: int,
+                 burn_in: int = 200, workers: int = 1, path: str = DEFAULT_PATH, seed: int = 0) -> dict:
+    """ Gibbs com as cadeias divididas entre `workers` processos. Retorna a estimativa de
+    cada consulta (média dos traços depois do burn-in) e o ESS de cada uma."""
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(path, dict(evidence), list(queries), c, steps, burn_in, s)
+            for c, s in zip(_split(chains, workers), seeds) if c > 0]
+    traces = np.concatenate(_run(_gibbs_worker, jobs, min(workers, len(jobs))), axis=1)
+    return {"estimates": {q: float(traces[i].mean()) for i, q in enumerate(queries)},
+            "ess": {q: effective_sample_size(traces[i].astype(float)) for i, q in enumerate(queries)},
+            "samples": chains * steps}
+
+
+def compare(evidence: Mapping[str, int], samples: int = 1_000_000, chains: int = 256, steps: int = 2_000,
+            workers: int = 4, path: str = DEFAULT_PATH, seed: int = 0) -> dict:
+    """ Estimativas das duas formas contra a resposta exata do artefato, com ESS e tempo."""
+    network = CompiledNetwork(path)
+    queries = [q for q in network.queries if q not in evidence]
+    exact = network.posterior(evidence, queries)
+    result = {"exact": exact}
+    print(f"evidência {dict(evidence)}; {workers} processo(s)")
+    print("  exata: " + ", ".join(f"{q} {p:.5f}" for q, p in exact.items()))
+
+    start = time.perf_counter()
+    lw = sample_lw(evidence, queries, samples, workers, path, seed)
+    lw["seconds"] = time.perf_counter() - start
+    lw["error"] = {q: abs(lw["estimates"][q] - exact[q]) for q in queries}
+    result["likelihood_weighting"] = lw
+    print(f"  likelihood weighting, {samples} amostras, ESS {lw['ess']:,.0f}, {lw['seconds']:.2f}s: "
+          + ", ".join(f"{q} {lw['estimates'][q]:.5f} (erro {lw['error'][q]:.1e})" for q in queries))
+
+    start = time.perf_counter()
+    gibbs = sample_gibbs(evidence, queries, chains, steps, workers=workers, path=path, seed=seed)
+    gibbs["seconds"] = time.perf_counter() - start
+    gibbs["error"] = {q: abs(gibbs["estimates"][q] - exact[q]) for q in queries}
+    result["gibbs"] = gibbs
+    print(f"  Gibbs, {chains} cadeias x {steps} varreduras, {gibbs['seconds']:.2f}s: "
+          + ", ".join(f"{q} {gibbs['estimates'][q]:.5f} (erro {gibbs['error'][q]:.1e}, ESS {gibbs['ess'][q]:,.0f})"
+                      for q in queries))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inferência aproximada por amostragem na rede bayesiana")
+    parser.add_argument('evidence', nargs='*', help="evidências no formato sintoma=0|1")
+    parser.add_argument('--artifact', default=DEFAULT_PATH, help="arquivo .npz (gerado se não existir)")
+    parser.add_argument('--samples', type=int, default=1_000_000, help="amostras do likelihood weighting")
+    parser.add_argument('--chains', type=int, default=256, help="cadeias de Gibbs")
+    parser.add_argument('--steps', type=int, default=2_000, help="varreduras guardadas por cadeia")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="processos")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.artifact):
+        import bayesian
+        from bayes_compiled import export_model
+        export_model(bayesian.model, args.artifact, bayesian.DOENCAS)
+    evidence = {}
+    for item in args.evidence:
+        name, _, value = item.partition('=')
+        evidence[name] = int(value)
+    compare(evidence or {'tosse': 1, 'febre': 1}, args.samples, args.chains, args.steps, args.workers,
+            args.artifact, args.seed)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,4 +1,6 @@
+from functools import lru_cache
 from itertools import product
+from typing import Dict, FrozenSet, Mapping, Sequence, Tuple
 from pgmpy.inference import VariableElimination
 from pgmpy.models import DiscreteBayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
@@ -178,35 +180,66 @@ assert model.check_model(), "Modelo inválido (CPDs inconsistentes)."
 # --- variável de inferência ---
 infer = VariableElimination(model)
 
+DOENCAS = ('influenza', 'tuberculose')
+CACHE_SIZE = 4096  # padrões de evidência distintos guardados (a triagem repete poucos padrões)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _posterior_congelada(evidencia: FrozenSet[Tuple[str, int]], variaveis: Tuple[str, ...]) -> Tuple[float, ...]:
+    """ Uma única eliminação de variáveis para a conjunta das variáveis consultadas; as
+    marginais saem somando os outros eixos da tabela (2^len(variaveis) entradas).
+    Chave do cache: evidência congelada + variáveis, ambas hashable."""
+    conjunta = infer.query(list(variaveis), evidence=dict(evidencia), show_progress=False)
+    valores = conjunta.values
+    resultado = []
+    for var in variaveis:
+        eixo = conjunta.variables.index(var)
+        marginal = valores.sum(axis=tuple(i for i in range(valores.ndim) if i != eixo))
+        resultado.append(float(marginal[1] / marginal.sum()))
+    return tuple(resultado)
+
+
+def posterior(evid_dict: Mapping[str, int], variaveis: Sequence[str] = DOENCAS) -> Dict[str, float]:
+    """ P(var=1 | evid) para cada variável pedida, com as marginais calculadas juntas e
+    guardadas num cache LRU pela evidência. Variável observada na evidência devolve o
+    próprio valor observado."""
+    livres = tuple(var for var in variaveis if var not in evid_dict)
+    valores = _posterior_congelada(frozenset(evid_dict.items()), livres) if livres else ()
+    resultado = dict(zip(livres, valores))
+    return {var: resultado[var] if var in resultado else float(evid_dict[var]) for var in variaveis}
+
+
+posterior_cache_info = _posterior_congelada.cache_info
+posterior_cache_clear = _posterior_congelada.cache_clear
+
 
 def consulta_posterior(evid_dict):
     """Imprime P(influenza=1 | evid) e P(tuberculose=1 | evid)"""
-    q_inf = infer.query(['influenza'], evidence=evid_dict, show_progress=False)
-    q_tb = infer.query(['tuberculose'], evidence=evid_dict,
-                       show_progress=False)
+    p = posterior(evid_dict)
     print(f"Evidência: {evid_dict}")
-    print("P(influenza=1 | evid) =", round(float(q_inf.values[1]), 4))
-    print("P(tuberculose=1 | evid) =", round(float(q_tb.values[1]), 6))
+    print("P(influenza=1 | evid) =", round(p['influenza'], 4))
+    print("P(tuberculose=1 | evid) =", round(p['tuberculose'], 6))
     print("-"*50)
 
 
-# ----Cenários de teste -----
-consulta_posterior({'tosse': 1, 'febre': 1})  # paciente com tosse e febre
-# tosse, febre e RX alterado
-consulta_posterior({'tosse': 1, 'febre': 1, 'raiox_alterado': 1})
-consulta_posterior({'mialgia': 1, 'congestao_nasal': 1}
-                   )  # sintomas típicos de influenza
-consulta_posterior(
-    # Sintomas típicos de tuberculose
-    {'perda_peso': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1})
-consulta_posterior(
-    # todos os sintomas de tuberculose
-    {'tosse': 1, 'febre': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1, 'perda_peso': 1})
-consulta_posterior(
-    # todos os sintomas das duas doenças
-    {'tosse': 1, 'febre': 1, 'mialgia': 1, 'congestao_nasal': 1,
-     'perda_peso': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1}
-)
+if __name__ == "__main__":
+    # ----Cenários de teste -----
+    consulta_posterior({'tosse': 1, 'febre': 1})  # paciente com tosse e febre
+    # tosse, febre e RX alterado
+    consulta_posterior({'tosse': 1, 'febre': 1, 'raiox_alterado': 1})
+    consulta_posterior({'mialgia': 1, 'congestao_nasal': 1}
+                       )  # sintomas típicos de influenza
+    consulta_posterior(
+        # Sintomas típicos de tuberculose
+        {'perda_peso': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1})
+    consulta_posterior(
+        # todos os sintomas de tuberculose
+        {'tosse': 1, 'febre': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1, 'perda_peso': 1})
+    consulta_posterior(
+        # todos os sintomas das duas doenças
+        {'tosse': 1, 'febre': 1, 'mialgia': 1, 'congestao_nasal': 1,
+         'perda_peso': 1, 'sudorese_noturna': 1, 'raiox_alterado': 1}
+    )
 
 """
 REFERÊNCIAS (links diretos) — bases usadas para montar as CPDs